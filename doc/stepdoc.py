@@ -1,130 +1,150 @@
 #!../python_env/bin/python
 
+import concurrent.futures
+import functools
 import yaml
 import string
 import os
 import logging
-import glob
 import sys
 sys.path.append('../include')
-sys.path.append('../include/steps')
-sys.path.append('../include/sources')
+# abstract_step adds the steps and sources directories to sys.path
 from pipeline import coreutils
 import abstract_step
 
+_GRAPHVIZ_HEADER = (
+    "\n"
+    ".. graphviz::\n"
+    "\n"
+    "   digraph foo {{\n"
+    "      rankdir = LR;\n"
+    "      splines = true;\n"
+    "      graph [fontname = Helvetica, fontsize = 12, size = \"14, 11\", "
+    "nodesep = 0.2, ranksep = 0.3];\n"
+    "      node [fontname = Helvetica, fontsize = 12, shape = rect];\n"
+    "      edge [fontname = Helvetica, fontsize = 12];\n"
+    "      {name} [style=filled, fillcolor=\"#fce94f\"];\n"
+)
 
-def doc_module(module_name, fout, uap_tools):
-    step_class = abstract_step.AbstractStep.get_step_class_for_key(module_name)
+_CON_LINE_TPL = "  - **{con}**{opt}{fmt}{desc}\n"
+
+_OPTION_LINE_TPL = "  - **{key}** ({types}, {optional}){desc}{default}{choices}\n"
+
+
+@functools.lru_cache(maxsize=None)
+def _get_step_class(name):
+    return abstract_step.AbstractStep.get_step_class_for_key(name)
+
+
+def _list_modules(path):
+    """
+    Returns the sorted names of all python modules in the directory ``path``.
+    """
+    with os.scandir(path) as it:
+        return sorted(entry.name[:-3] for entry in it
+                      if entry.name.endswith('.py') and '__' not in entry.name)
+
+
+def _emit_connections(parts, header, cons, optional, formats, descriptions):
+    parts.append(header)
+    for con in cons:
+        parts.append(_CON_LINE_TPL.format_map({
+            'con': con,
+            'opt': " (optional)" if con in optional else "",
+            'fmt': " Format: **%s**" % formats[con] if con in formats else "",
+            'desc': ' - %s' % descriptions[con] if con in descriptions else ""
+        }))
+    parts.append("\n")
+
+
+def doc_module(module_name, uap_tools):
+    """
+    Returns the reStructuredText documentation of the step ``module_name``.
+    """
+    parts = list()
+    add = parts.append
+    step_class = _get_step_class(module_name)
     step = step_class(None)
-    fout.write(".. index:: %s\n" % module_name)
-    fout.write("\n")
-    fout.write(module_name + "\n")
-    fout.write('=' * len(module_name) + "\n\n")
-    fout.write("\n")
-    if step.__doc__:
-        doc = step.__doc__.split("\n")
-        for line in doc:
-            fout.write(line.rstrip() + "\n")
+    is_source = issubclass(step_class, abstract_step.AbstractSourceStep)
+    add(".. index:: %s\n" % module_name)
+    add("\n")
+    add(module_name + "\n")
+    add('=' * len(module_name) + "\n\n")
+    add("\n")
+    doc = step.__doc__
+    if doc:
+        add("\n".join(line.rstrip() for line in doc.splitlines()) + "\n")
 
     # print connections
-    in_con = step.get_in_connections()
-    out_con = step.get_out_connections()
+    all_cons = sorted(step.get_connections())
+    in_con = [c for c in all_cons if c.startswith('in/')]
+    out_con = [c for c in all_cons if c.startswith('out/')]
+    fmt_map = step._connection_formats
+    desc_map = step._connection_descriptions
     if in_con:
-        fout.write("**Input Connection**\n")
-        for con in sorted(in_con):
-            fout.write("  - **%s**" % con)
-            if con in step._optional_connections:
-                fout.write(" (optional)")
-            if con in step._connection_formats.keys():
-                format = step._connection_formats[con]
-                fout.write(" Format: **%s**" % format)
-            if con in step._connection_descriptions.keys():
-                fout.write(' - %s' % step._connection_descriptions[con])
-            fout.write("\n")
-        fout.write("\n")
+        _emit_connections(parts, "**Input Connection**\n", in_con,
+                          step._optional_connections, fmt_map, desc_map)
     if out_con:
-        fout.write("**Output Connection**\n")
-        for con in sorted(out_con):
-            fout.write("  - **%s**" % con)
-            if con in step._optional_connections:
-                fout.write(" (optional)")
-            if con in step._connection_formats.keys():
-                format = step._connection_formats[con]
-                fout.write(" Format: **%s**" % format)
-            if con in step._connection_descriptions.keys():
-                fout.write(' - %s' % step._connection_descriptions[con])
-            fout.write("\n")
-        fout.write("\n")
-    fout.write("\n")
-    fout.write(".. graphviz::\n")
-    fout.write("\n")
-    fout.write("   digraph foo {\n")
-    fout.write("      rankdir = LR;\n")
-    fout.write("      splines = true;\n")
-    fout.write(
-        "      graph [fontname = Helvetica, fontsize = 12, size = \"14, 11\", nodesep = 0.2, ranksep = 0.3];\n")
-    fout.write(
-        "      node [fontname = Helvetica, fontsize = 12, shape = rect];\n")
-    fout.write("      edge [fontname = Helvetica, fontsize = 12];\n")
-    fout.write(
-        "      %s [style=filled, fillcolor=\"#fce94f\"];\n" %
-        module_name)
-    for index, c in enumerate(sorted(step.get_connections())):
+        _emit_connections(parts, "**Output Connection**\n", out_con,
+                          step._optional_connections, fmt_map, desc_map)
+    add(_GRAPHVIZ_HEADER.format(name=module_name))
+
+    def graph_lines(index, c):
         if c in step._optional_connections:
             fill = ', style=filled, fillcolor="#a7a7a7"'
         else:
             fill = ''
         c = c.split('/')
         if c[0] == 'out':
-            fout.write(
-                "      out_%d [label=\"%s\"%s];\n" %
-                (index, c[1], fill))
-            fout.write("      %s -> out_%d;\n" % (module_name, index))
-        else:
-            fout.write("      in_%d [label=\"%s\"%s];\n" % (index, c[1], fill))
-            fout.write("      in_%d -> %s;\n" % (index, module_name))
-    fout.write("   }\n")
-    fout.write("\n")
+            return "      out_%d [label=\"%s\"%s];\n" \
+                "      %s -> out_%d;\n" % (index, c[1], fill, module_name, index)
+        return "      in_%d [label=\"%s\"%s];\n" \
+            "      in_%d -> %s;\n" % (index, c[1], fill, index, module_name)
+    add(''.join([graph_lines(index, c)
+                 for index, c in enumerate(all_cons)]))
+    add("   }\n")
+    add("\n")
 
     # print options
-    if len(step._defined_options) > 0:
-        fout.write("**Options:**\n")
-        for key in sorted(step._defined_options.keys()):
-            option = step._defined_options[key]
-            fout.write("  - **%s** (%s, %s)" % (
-                key,
-                '/'.join([_.__name__ for _ in option['types']]),
-                'optional' if option['optional'] else 'required'
-            ))
-            if option['description']:
-                fout.write(" -- %s" % option['description'])
-                fout.write("\n")
-            if option['default']:
-                fout.write("    - default value: %s\n" % option['default'])
+    opts = step._defined_options
+    if len(opts) > 0:
+        add("**Options:**\n")
+        for key in sorted(opts):
+            option = opts[key]
             if option['choices']:
-                fout.write("    - possible values: %s\n" %
-                           ", ".join(["'%s'" % x for x in option['choices']]))
-                fout.write("\n")
-            fout.write("\n")
-        fout.write("\n")
+                choices = ", ".join(f"'{x}'" for x in option['choices'])
+                choices = f"    - possible values: {choices}\n\n"
+            else:
+                choices = ""
+            add(_OPTION_LINE_TPL.format_map({
+                'key': key,
+                'types': '/'.join(t.__name__ for t in option['types']),
+                'optional': 'optional' if option['optional'] else 'required',
+                'desc': f" -- {option['description']}\n"
+                        if option['description'] else "",
+                'default': f"    - default value: {option['default']}\n"
+                           if option['default'] else "",
+                'choices': choices
+            }))
+        add("\n")
 
     # print tools
     def tooltag(tool):
         return ' (coreutils)' if tool in coreutils else ''
     tools = [t+tooltag(t) for t in step._tools.keys() if t not in uap_tools]
     if tools:
-        fout.write("**Required tools:** %s\n" % ', '.join(sorted(tools)))
-        fout.write("\n")
+        add("**Required tools:** %s\n" % ', '.join(sorted(tools)))
+        add("\n")
 
-    if abstract_step.AbstractSourceStep in step.__class__.__bases__:
+    if is_source:
         # this is a source step which does not create any tasks
-        fout.write(
+        add(
             "This step provides input files which already exists and therefore creates no tasks in the pipeline.\n")
-        fout.write("\n")
+        add("\n")
     else:
         # this is a step which creates tasks
-        fout.write("**CPU Cores:** %s\n" % step._cores)
-        fout.write("\n")
+        add("**CPU Cores:** %s\n" % step._cores)
+        add("\n")
 
     '''
     print("Cores: %d" % step._cores)
@@ -133,35 +153,34 @@ def doc_module(module_name, fout, uap_tools):
     print("Options: %s" % sorted(step._defined_options.keys()))
     print(step.__doc__)
     '''
+    return ''.join(parts)
 
 
 def main():
     abs_path = os.path.dirname(os.path.realpath(__file__))
-    uap_tools = glob.glob(os.path.join(abs_path, '../tools/*.py'))
-    uap_tools = [os.path.basename(t).replace('.py', '') for t in uap_tools]
+    uap_tools = frozenset(_list_modules(os.path.join(abs_path, '../tools')))
+    parts = list()
+    parts.append("###############\n")
+    parts.append("Available steps\n")
+    parts.append("###############\n")
+    parts.append("\n")
+    parts.append("************\n")
+    parts.append("Source steps\n")
+    parts.append("************\n\n")
+    source_steps = _list_modules(os.path.join(abs_path, '../include/sources'))
+    steps = [m for m in _list_modules(os.path.join(abs_path, '../include/steps'))
+             if m != 'io_step']
+    render = functools.partial(doc_module, uap_tools=uap_tools)
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        source_docs = list(executor.map(render, source_steps))
+        step_docs = list(executor.map(render, steps))
+    parts.extend(source_docs)
+    parts.append("****************\n")
+    parts.append("Processing steps\n")
+    parts.append("****************\n\n")
+    parts.extend(step_docs)
     with open(os.path.join(abs_path, 'source/steps.rst'), 'w') as fout:
-        fout.write("###############\n")
-        fout.write("Available steps\n")
-        fout.write("###############\n")
-        fout.write("\n")
-        fout.write("************\n")
-        fout.write("Source steps\n")
-        fout.write("************\n\n")
-        modules = glob.glob(os.path.join(abs_path, '../include/sources/*.py'))
-        for m in sorted(modules):
-            module_name = os.path.basename(m).replace('.py', '')
-            if '__' not in module_name:
-                doc_module(module_name, fout, uap_tools)
-        fout.write("****************\n")
-        fout.write("Processing steps\n")
-        fout.write("****************\n\n")
-        modules = glob.glob(os.path.join(abs_path, '../include/steps/*.py'))
-        for m in sorted(modules):
-            module_name = os.path.basename(m).replace('.py', '')
-            if module_name == 'io_step':
-                continue
-            if '__' not in module_name:
-                doc_module(module_name, fout, uap_tools)
+        fout.write(''.join(parts))
 
 
 if __name__ == '__main__':
@@ -11,7 +11,10 @@ steps can introduce files from outside the destination path into the pipeline.
 
 # 1. standard library imports
 import sys
+from collections import Counter, deque
 from datetime import datetime
+import functools
+import errno
 import inspect
 from logging import getLogger
 import os
@@ -21,11 +24,15 @@ import signal
 import socket
 import time
 import traceback
-from shutil import copyfile
+from concurrent.futures import ThreadPoolExecutor
+from shutil import copyfile, move as shutil_move
 from tqdm import tqdm
-import multiprocessing
 # 2. related third party imports
 import yaml
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
 # 3. local application/library specific imports
 from uaperrors import UAPError
 from connections_collector import ConnectionsCollector
@@ -39,6 +46,30 @@ abs_path = os.path.dirname(os.path.realpath(__file__))
 sys.path.insert(0, os.path.join(abs_path, 'steps'))
 sys.path.insert(0, os.path.join(abs_path, 'sources'))
 logger = getLogger('uap_logger')
+_WS_RE = re.compile(r'\s')
+_WS_SEQ_RE = re.compile(r'\s+')
+_ALLOWED_OPTION_TYPES = frozenset([int, float, str, bool, list, dict])
+_OPTION_KW_DEFAULTS = ('default', 'description', 'choices')
+# resolved once, the user lookup may go through NSS/LDAP
+_HOSTNAME = socket.gethostname()
+_USER = pwd.getpwuid(os.getuid())[0]
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_step_class(key):
+    check_classes = [AbstractSourceStep, AbstractStep]
+    members = [obj for obj in vars(__import__(key)).values()
+               if inspect.isclass(obj)]
+    for index, c in enumerate(check_classes):
+        classes = [obj for obj in members if c in obj.__bases__
+                   and obj not in check_classes[:index]]
+        if len(classes) > 0:
+            if len(classes) != 1:
+                raise UAPError("need exactly one subclass of %s in %s"
+                               % (c, key))
+            return classes[0]
+
+    raise UAPError("No suitable class found for module %s." % key)
 
 
 class AbstractStep(object):
@@ -46,7 +77,7 @@ class AbstractStep(object):
     PING_TIMEOUT = 300
     PING_RENEW = 30
     VOLATILE_SUFFIX = '.volatile.placeholder.yaml'
-    UNDERSCORE_OPTIONS = [
+    UNDERSCORE_OPTIONS = frozenset([
         '_depends',
         '_volatile',
         '_BREAK',
@@ -58,7 +89,18 @@ class AbstractStep(object):
         '_cluster_post_job_command',
         '_cluster_job_quota',
         '_singularity_container',
-        '_singularity_options']
+        '_singularity_options'])
+    # immutable defaults only, _connect and _depends need fresh objects
+    _UNDERSCORE_DEFAULTS = (
+        ('_volatile', False),
+        ('_cluster_submit_options', ''),
+        ('_cluster_pre_job_command', ''),
+        ('_cluster_post_job_command', ''),
+        ('_singularity_container', ''),
+        ('_singularity_options', ''),
+        ('_cluster_job_quota', 0),
+        ('_pattern', '(.*)'),
+        ('_replacement', r'\1'))
 
     states = misc.Enum(['DEFAULT', 'EXECUTING'])
 
@@ -93,6 +135,11 @@ class AbstractStep(object):
         self._cores = 1
         self._connections = set()
         self._optional_connections = set()
+        self._connections_cache = dict()
+        '''
+        Frozensets returned by ``get_in_connections`` and
+        ``get_out_connections``, cleared by ``add_connection``.
+        '''
         self._connection_formats = dict()
         self._connection_descriptions = dict()
         self._pre_command = dict()
@@ -119,13 +166,16 @@ class AbstractStep(object):
         The intention is to make further changes to the step
         impossible, but apparently, it's checked nowhere at the moment.
         '''
-        if self.finalized:
-            return
-
-        for parent_step in self.dependencies:
-            parent_step.finalize()
-
-        self.finalized = True
+        # walk the ancestors iteratively, the finalized flag marks visited
+        # steps so shared ancestors are only processed once
+        stack = [self]
+        while stack:
+            step = stack.pop()
+            if step.finalized:
+                continue
+            step.finalized = True
+            stack.extend(parent for parent in step.dependencies
+                         if not parent.finalized)
 
     def _reset(self):
         self._pipeline_log = dict()
@@ -142,7 +192,7 @@ class AbstractStep(object):
         '''
         run_id = re.sub(self._options['_pattern'], self._options['_replacement'], run_id)
         # Replace whitespaces by underscores
-        run_id = re.sub(r'\s', '_', run_id)
+        run_id = _WS_RE.sub('_', run_id)
         if run_id in self._runs:
             raise UAPError(
                 "Cannot declare the same run ID twice: %s." % run_id)
@@ -179,6 +229,7 @@ class AbstractStep(object):
         the default values set in self.add_option().
         '''
         self._options = dict()
+        unknown_keys = list()
 
         # set options
         for key, value in options.items():
@@ -189,26 +240,34 @@ class AbstractStep(object):
                 self._options[key] = value
             else:
                 if key not in self._defined_options:
-                    message = "Unknown option in %s (%s): %s." % \
-                        (self.get_step_name(), self.get_step_type(), key)
-                    logger.error(message + "\nAvailable options are:\n%s" %
-                                 yaml.dump(self._defined_options,
-                                           Dumper=misc.UAPDumper))
-                    raise UAPError(message)
-                if value is not None and type(
-                        value) not in self._defined_options[key]['types']:
+                    unknown_keys.append(key)
+                    continue
+                option = self._defined_options[key]
+                # exact type match on purpose, isinstance would accept
+                # booleans for int options
+                if value is not None and type(value) not in option['types']:
                     raise UAPError(
                         "Invalid type for option %s - it's %s and should be "
-                        "one of %s." % (key, type(value),
-                                        self._defined_options[key]['types']))
-                if self._defined_options[key]['choices'] is not None and \
-                   value not in self._defined_options[key]['choices']:
+                        "one of %s." % (key, type(value), option['types']))
+                if option['choices'] is not None and \
+                   value not in option['choices']:
                     raise UAPError(
                         "Invalid value '%s' specified for option %s - "
                         "possible values are %s." %
-                        (value, key, self._defined_options[key]['choices']))
+                        (value, key, option['choices']))
                 self._options[key] = value
 
+        if unknown_keys:
+            # report all unknown keys at once so the available options
+            # are only dumped a single time
+            message = "Unknown option in %s (%s): %s." % \
+                (self.get_step_name(), self.get_step_type(),
+                 ', '.join(unknown_keys))
+            logger.error(message + "\nAvailable options are:\n%s" %
+                         yaml.dump(self._defined_options,
+                                   Dumper=misc.UAPDumper))
+            raise UAPError(message)
+
         # set default values for unset options and make sure all required
         # options have been set
         for key, info in self._defined_options.items():
@@ -218,30 +277,25 @@ class AbstractStep(object):
                         "Required option not set in %s: %s." % (self, key))
                 self._options[key] = info['default']
 
-        self._options.setdefault('_volatile', False)
-
-        for i in ['_cluster_submit_options', '_cluster_pre_job_command',
-                  '_cluster_post_job_command', '_singularity_container',
-                  '_singularity_options']:
-            self._options.setdefault(i, '')
-        self._options.setdefault('_cluster_job_quota', 0)
-        self._options.setdefault('_pattern', '(.*)')
-        self._options.setdefault('_replacement', r'\1')
+        for key, default in self._UNDERSCORE_DEFAULTS:
+            self._options.setdefault(key, default)
 
         self._options.setdefault('_connect', dict())
         self._options.setdefault('_depends', list())
         if not isinstance(self._options['_depends'], list):
             self._options['_depends'] = [self._options['_depends']]
         # add implied dependencies
+        # We cannot use sets here since the order of dependecies matters in
+        # rare cases, e.g., collect_scs. The set only speeds up the lookup.
+        depends = self._options['_depends']
+        seen = set(depends)
         for in_cons in self._options['_connect'].values():
             in_cons = in_cons if isinstance(in_cons, list) else [in_cons]
             for parent_cons in in_cons:
-                parent = parent_cons.split("/")[0]
-                if parent not in self._options['_depends'] \
-                        and parent != 'empty':
-                    # We cannot use sets here since the order of
-                    # dependecies matters in rare cases, e.g., collect_scs.
-                    self._options['_depends'].append(parent)
+                parent = parent_cons.partition("/")[0]
+                if parent not in seen and parent != 'empty':
+                    seen.add(parent)
+                    depends.append(parent)
 
     def get_options(self):
         '''
@@ -271,11 +325,36 @@ class AbstractStep(object):
         is_set = key in self._options
         if is_set:
             if isinstance(self._options[key], list):
-                is_set = any([v is not None for v in self._options[key]])
+                is_set = any(v is not None for v in self._options[key])
             else:
                 is_set = self._options[key] is not None
         return is_set
 
+    def get_option_arguments(self, options, prefix='--', separator=None):
+        """
+        Returns the command line arguments for all of the given options
+        that are set in the configuration. A boolean option becomes a flag
+        if it is true. Other options are followed by their value, or joined
+        with it by *separator* if one is given.
+        """
+        is_set = self.is_option_set_in_config
+        values = self._options
+        arguments = list()
+        for option in options:
+            if not is_set(option):
+                continue
+            value = values[option]
+            if isinstance(value, bool):
+                if value:
+                    arguments.append(prefix + option)
+            elif separator is None:
+                arguments.append(prefix + option)
+                arguments.append(str(value))
+            else:
+                arguments.append(
+                    '%s%s%s%s' % (prefix, option, separator, value))
+        return arguments
+
     def is_volatile(self):
         return self._options['_volatile']
 
@@ -300,10 +379,8 @@ class AbstractStep(object):
         '''
         Return a dict which contains all runs per parent steps.
         '''
-        input_runs = dict()
-        for parent in self.get_dependencies():
-            input_runs[parent.get_step_name()] = parent.get_runs()
-        return input_runs
+        return {parent.get_step_name(): parent.get_runs()
+                for parent in self.get_dependencies()}
 
     def declare_runs(self):
         # fetch all incoming run IDs which produce reads...
@@ -316,13 +393,13 @@ class AbstractStep(object):
         were set by all runs.
         '''
         required_out = self.get_out_connections(with_optional=False)
+        step_name = self.get_step_name()
+        step_type = self.get_step_type()
         bad_runs = 0
         for run_id, run in self._runs.items():
-            used_conns = set()
-            for connection, content in run._output_files.items():
-                used = any([fl is not None for fl in content.keys()])
-                if used:
-                    used_conns.add(connection)
+            used_conns = {connection for connection, content
+                          in run._output_files.items()
+                          if any(fl is not None for fl in content)}
             missings = required_out - used_conns
             if missings:
                 bad_runs += 1
@@ -331,10 +408,10 @@ class AbstractStep(object):
                     'connections %s. To remove this warning pass '
                     'optional=True to the add_connection method in the '
                     'step constructor __init__ of "%s".' %
-                    (run_id, self.get_step_name(), list(missings), self.get_step_type()))
+                    (run_id, step_name, list(missings), step_type))
             if bad_runs == 5:
                 logger.warning('... Emitting connection test for further '
-                               'runs of "%s".' % self.get_step_name())
+                               'runs of "%s".' % step_name)
                 break
         if bad_runs:
             logger.warning(
@@ -403,23 +480,29 @@ class AbstractStep(object):
 
         If there are no runs as this method is called, they are created here.
         '''
-        # create runs if they don't exist yet
-        if not self._runs:
+        # create runs if they don't exist yet, a step that declared no runs
+        # is not asked again
+        if self._runs is None:
             # if _BREAK: true is specified in the configuration,
             # return no runs and thus cut off further processing
             if '_BREAK' in self._options and self._options['_BREAK']:
                 return dict()
 
             self._runs = dict()
-            self.declare_runs()
+            try:
+                self.declare_runs()
+            except BaseException:
+                # do not cache a partially declared set of runs
+                self._runs = None
+                raise
 
             # define file dependencies
             for run_id in self._runs.keys():
                 pipeline = self.get_pipeline()
                 run = self.get_run(run_id)
-                for connection in run.get_output_files_abspath().keys():
-                    for output_path, input_paths in \
-                            run.get_output_files_abspath()[connection].items():
+                ofa = run.get_output_files_abspath()
+                for connection in ofa.keys():
+                    for output_path, input_paths in ofa[connection].items():
                         # proceed if we have normal output_path/input_paths
                         if output_path is not None and input_paths is not None:
                             # store file dependencies
@@ -485,17 +568,17 @@ class AbstractStep(object):
                     logger.debug('The run ping file "%s" was moved to "%s" '
                                  'and copied to "%s" by host %s.' %
                                  (ping_path, out_w_bad, out_w_suffix,
-                                  socket.gethostname()))
+                                  _HOSTNAME))
                 elif backup:
                     os.rename(ping_path, out_w_suffix)
                     logger.debug('The run ping file "%s" was moved to "%s" '
                                  'by host %s.' %
                                  (ping_path, out_w_suffix,
-                                  socket.gethostname()))
+                                  _HOSTNAME))
                 else:
                     os.unlink(ping_path)
                     logger.debug('The run ping file "%s" was removed by %s.' %
-                                 (ping_path, socket.gethostname()))
+                                 (ping_path, _HOSTNAME))
             except OSError as e:
                 logger.debug('The run ping file "%s" could not be moved: %s' %
                              (ping_path, str(e)))
@@ -528,7 +611,7 @@ class AbstractStep(object):
         queued_ping_path = run.get_queued_ping_file()
         try:
             with open(queued_ping_path, 'r') as buff:
-                info = yaml.load(buff, Loader=yaml.FullLoader)
+                info = yaml.load(buff, Loader=SafeLoader)
             job_id = info['cluster job id']
         except (IOError, KeyError):
             job_id = None
@@ -539,43 +622,51 @@ class AbstractStep(object):
 
         # prepare known_paths
         known_paths = dict()
+        basename = os.path.basename
+        # run directories never end with a separator, so concatenating
+        # strings gives the same paths as os.path.join but is cheaper
+        temp_prefix = temp_directory + os.sep
+        for temp_name, content in run.get_temp_file_contents().items():
+            with open(temp_prefix + temp_name, 'w') as f:
+                f.write(content)
         for tag, tag_info in run.get_output_files_abspath().items():
             for output_path, input_paths in tag_info.items():
                 # add the real output path
                 if output_path is not None and input_paths is not None:
+                    output_name = basename(output_path)
                     known_paths[output_path] = {
                         'designation': 'output',
-                        'label': os.path.basename(output_path),
+                        'label': output_name,
                         'type': 'step_file'}
                     # ...and also add the temporary output path
-                    known_paths[
-                        os.path.join(temp_directory, os.path.basename(
-                            output_path))] = {
+                    known_paths[temp_prefix + output_name] = {
                         'designation': 'output',
-                        'label': "%s\\n(%s)" %
-                                (os.path.basename(output_path), tag),
+                        'label': "%s\\n(%s)" % (output_name, tag),
                         'type': 'step_file',
                         'real_path': output_path}
                     for input_path in input_paths:
                         if input_path is not None:
                             known_paths[input_path] = {
                                 'designation': 'input',
-                                'label': os.path.basename(input_path),
+                                'label': basename(input_path),
                                 'type': 'step_file'}
 
         # now write the run ping file
         executing_ping_info = dict()
         executing_ping_info['start_time'] = datetime.now()
-        executing_ping_info['host'] = socket.gethostname()
+        executing_ping_info['host'] = _HOSTNAME
         executing_ping_info['pid'] = os.getpid()
-        executing_ping_info['user'] = pwd.getpwuid(os.getuid())[0]
+        executing_ping_info['user'] = _USER
         executing_ping_info['temp_directory'] = run.get_temp_output_directory()
         if job_id:
             executing_ping_info['cluster job id'] = job_id
 
         with open(executing_ping_path, 'w') as f:
-            f.write(yaml.dump(executing_ping_info, default_flow_style=False))
+            f.write(yaml.dump(executing_ping_info, Dumper=SafeDumper,
+                              default_flow_style=False))
 
+        # a forked process instead of a thread, process_pool forks while
+        # the step runs and a thread could hold locks in the children
         executing_ping_pid = os.fork()
         if executing_ping_pid == 0:
             # this is the chid process
@@ -619,7 +710,7 @@ class AbstractStep(object):
 
         self.start_time = datetime.now()
         message = "[START] starting %s/%s on %s" % \
-            (self, run_id, socket.gethostname())
+            (self, run_id, _HOSTNAME)
         if job_id:
             message += " with job id %s" % job_id
         p.notify(message)
@@ -656,8 +747,9 @@ class AbstractStep(object):
             # now log file stats
 
             try:
-                for tag in run.get_output_files().keys():
-                    for out_file in run.get_output_files()[tag].keys():
+                output_prefix = run.get_output_directory() + os.sep
+                for tag, out_files in run.get_output_files().items():
+                    for out_file in out_files:
                         # don't try to rename files if they were not meant to exist
                         # in our temporary directory
                         # 1. out_file should not be None (empty output connection)
@@ -665,33 +757,31 @@ class AbstractStep(object):
                         #    source step)
                         if out_file is None or '/' in out_file:
                             continue
-                        source_path = os.path.join(
-                            run.get_temp_output_directory(),
-                            os.path.basename(out_file)
-                        )
-                        new_path = os.path.join(
-                            run.get_output_directory(),
-                            os.path.basename(out_file))
+                        out_name = basename(out_file)
+                        source_path = temp_prefix + out_name
+                        new_path = output_prefix + out_name
                         # first, delete a possibly existing volatile placeholder
                         # file
                         path_volatile = new_path + AbstractStep.VOLATILE_SUFFIX
-                        if os.path.exists(path_volatile):
-                            logger.info("Now deleting: %s" % path_volatile)
+                        try:
                             os.unlink(path_volatile)
+                        except FileNotFoundError:
+                            pass
+                        else:
+                            logger.info("Deleted: %s" % path_volatile)
                         if os.path.exists(source_path):
                             known_paths.pop(source_path, None)
-                            known_paths.setdefault(new_path, dict())
-                            if known_paths[new_path]['designation'] == 'output':
+                            kp = known_paths[new_path]
+                            if kp['designation'] == 'output':
                                 to_be_moved[source_path] = new_path
-                                size = run.fsc.getsize(source_path)
-                                mtime = datetime.fromtimestamp(
-                                    run.fsc.getmtime(source_path))
-                                known_paths[new_path]['size'] = size
-                                known_paths[new_path]['modification time'] = mtime
-                            if known_paths[new_path]['type'] != 'step_file':
+                                st = run.fsc.stat(source_path)
+                                kp['size'] = st.st_size
+                                kp['modification time'] = \
+                                    datetime.fromtimestamp(st.st_mtime)
+                            if kp['type'] != 'step_file':
                                 logger.debug(
                                     "Set %s 'type' info to 'step_file'" % new_path)
-                                known_paths[new_path]['type'] = 'step_file'
+                                kp['type'] = 'step_file'
                         else:
                             raise UAPError('The step failed to produce an '
                                            'announced output file: "%s".\n'
@@ -700,8 +790,6 @@ class AbstractStep(object):
             except BaseException:
                 caught_exception = sys.exc_info()
 
-        pool = None
-
         class SignalError(Exception):
             def __init__(self, signum):
                 self.signum = signum
@@ -716,18 +804,17 @@ class AbstractStep(object):
                 show_progress = True
             else:
                 show_progress = False
-            try:
-                def stop(signum, frame):
-                    raise SignalError(signum)
-                original_term_handler = signal.signal(signal.SIGTERM, stop)
-                original_int_handler = signal.signal(signal.SIGINT, stop)
-                pool = multiprocessing.Pool(self.get_cores())
-                total = len(to_be_moved)
-                file_iter = pool.imap(misc.sha_and_file, to_be_moved.keys())
+            total = len(to_be_moved)
+            file_iter = None
+
+            def collect(hashes):
+                nonlocal file_iter
                 file_iter = tqdm(
-                    file_iter,
+                    hashes,
                     total=total,
                     leave=False,
+                    miniters=max(1, total // 200),
+                    mininterval=0.2,
                     bar_format='{desc}:{percentage:3.0f}%|{bar:10}{r_bar}',
                     disable=not show_progress,
                     desc='files')
@@ -737,32 +824,67 @@ class AbstractStep(object):
                     if not show_progress:
                         logger.info("sha256 [%d/%d] %s %s" %
                                     (i + 1, total, hashsum, path))
+            try:
+                def stop(signum, frame):
+                    raise SignalError(signum)
+                original_term_handler = signal.signal(signal.SIGTERM, stop)
+                original_int_handler = signal.signal(signal.SIGINT, stop)
+                if total <= 2 or self.get_cores() == 1:
+                    # not worth starting worker threads
+                    collect(map(misc.sha_and_file_mmap, to_be_moved.keys()))
+                else:
+                    with ThreadPoolExecutor(
+                            max_workers=self.get_cores()) as pool:
+                        futures = [pool.submit(misc.sha_and_file_mmap, path)
+                                   for path in to_be_moved.keys()]
+                        try:
+                            collect(f.result() for f in futures)
+                        except BaseException:
+                            # Executor.shutdown(cancel_futures=True) needs
+                            # Python 3.9
+                            for f in futures:
+                                f.cancel()
+                            raise
             except BaseException:
                 caught_exception = sys.exc_info()
-                try:
+                if file_iter is not None:
                     # removing the progress bar
                     file_iter.close()
-                except BaseException:
-                    pass
                 error = caught_exception[1]
                 if caught_exception[0] is SignalError:
                     p.caught_signal = error.signum
                 logger.error(error)
-                if pool:
-                    pool.terminate()
-            else:
-                pool.close()
             signal.signal(signal.SIGTERM, original_term_handler)
             signal.signal(signal.SIGINT, original_int_handler)
 
         run.add_known_paths(known_paths)
         if not p.caught_signal and not caught_exception:
+            moved = list()
             try:
-                for source_path, new_path in to_be_moved.items():
+                def move(paths):
+                    source_path, new_path = paths
                     logger.debug("Moving %s to %s." % (source_path, new_path))
-                    os.rename(source_path, new_path)
-            except BaseException:
+                    try:
+                        os.replace(source_path, new_path)
+                    except OSError as e:
+                        if e.errno != errno.EXDEV:
+                            raise
+                        # temp and output directory on different devices
+                        shutil_move(source_path, new_path)
+                    moved.append(new_path)
+                if len(to_be_moved) <= 2:
+                    for paths in to_be_moved.items():
+                        move(paths)
+                else:
+                    workers = min(32, len(to_be_moved))
+                    with ThreadPoolExecutor(max_workers=workers) as mover:
+                        # consuming the results re-raises the first error
+                        list(mover.map(move, to_be_moved.items()))
+            except OSError:
                 caught_exception = sys.exc_info()
+                logger.error("%s/%s: moved %d of %d output files before "
+                             "the failure." % (str(self), run_id, len(moved),
+                                               len(to_be_moved)))
 
         error = None
         if p.caught_signal is not None:
@@ -781,14 +903,14 @@ class AbstractStep(object):
 
         if error:
             message = "[BAD] %s/%s failed on %s after %s\n" % \
-                      (str(self), run_id, socket.gethostname(),
+                      (str(self), run_id, _HOSTNAME,
                        misc.duration_to_str(self.end_time - self.start_time))
             message += "Here are the details: " + annotation_path + '\n'
-            attachment = None
-            if os.path.exists(annotation_path + '.png'):
-                attachment = dict()
-                attachment['name'] = 'details.png'
-                attachment['data'] = open(annotation_path + '.png').read()
+            try:
+                with open(annotation_path + '.png', 'rb') as f:
+                    attachment = {'name': 'details.png', 'data': f.read()}
+            except FileNotFoundError:
+                attachment = None
             p.notify(message, attachment)
             self.remove_ping_file(queued_ping_path, bad_copy=True)
             if caught_exception is not None:
@@ -811,22 +933,19 @@ class AbstractStep(object):
             remaining_task_info = self.get_run_info_str()
 
             message = "[OK] %s/%s successfully finished on %s after %s\n" % \
-                      (str(self), run_id, socket.gethostname(),
+                      (str(self), run_id, _HOSTNAME,
                        misc.duration_to_str(self.end_time - self.start_time))
             message += str(self) + ': ' + remaining_task_info + "\n"
-            attachment = None
-            if os.path.exists(annotation_path + '.png'):
-                attachment = dict()
-                attachment['name'] = 'details.png'
-                attachment['data'] = open(annotation_path + '.png').read()
+            try:
+                with open(annotation_path + '.png', 'rb') as f:
+                    attachment = {'name': 'details.png', 'data': f.read()}
+            except FileNotFoundError:
+                attachment = None
             p.notify(message, attachment)
             self.remove_ping_file(queued_ping_path)
 
             self._reset()
 
-        if pool is not None:
-            pool.join()
-
     def get_pre_commands(self):
         """
         Return dictionary with commands to execute before starting any other
@@ -854,11 +973,12 @@ class AbstractStep(object):
         '''
         Returns a dict with a tool name for each tool paths.
         '''
-        return {' '.join(path): tool for tool, path in self._tools.items()}
+        return {path if isinstance(path, str) else ' '.join(path): tool
+                for tool, path in self._tools.items()}
 
     @property
     def used_tools(self):
-        return set(self._tools.keys())
+        return self._tools.keys()
 
     def get_module_unloads(self):
         """
@@ -875,31 +995,50 @@ class AbstractStep(object):
         return self._post_command
 
     def get_run_info_str(self, progress=False, do_hash=False):
-        count = {}
         runs = self.get_runs()
-        run_iter = tqdm(runs, total=len(runs), desc='runs',
-                        bar_format='{desc}:{percentage:3.0f}%|{bar:10}{r_bar}',
-                        disable=not progress, leave=False)
+        undeterminable = self.get_pipeline().states.UNDETERMINABLE
+
+        def state_of(run):
+            if isinstance(run, str):
+                run = self.get_run(run)
+            retries = 5
+            state = undeterminable
+            while retries > 0:
+                try:
+                    state = run.get_state(do_hash=do_hash)
+                except Exception:
+                    run.fsc.clear()
+                    retries -= 1
+                    continue
+                break
+            return state
+
+        pool = None
+        futures = list()
+        if do_hash and len(runs) > 1:
+            # hashing releases the GIL, so the runs are checked in threads
+            pool = ThreadPoolExecutor(max_workers=min(32, len(runs)))
+            futures = [pool.submit(state_of, run) for run in runs]
+            states = (f.result() for f in futures)
+        else:
+            states = map(state_of, runs)
+        if progress:
+            states = tqdm(states, total=len(runs), desc='runs',
+                          bar_format='{desc}:{percentage:3.0f}%|{bar:10}{r_bar}',
+                          leave=False)
         try:
-            for run in run_iter:
-                if isinstance(run, str):
-                    run = self.get_run(run)
-                retries = 5
-                state = self.get_pipeline().states.UNDETERMINABLE
-                while retries > 0:
-                    try:
-                        state = run.get_state(do_hash=do_hash)
-                    except Exception:
-                        run.fsc.clear()
-                        retries -= 1
-                        continue
-                    break
-                if state not in count:
-                    count[state] = 0
-                count[state] += 1
+            count = Counter(states)
         except BaseException:
-            run_iter.close()
+            if progress:
+                states.close()
+            # Executor.shutdown(cancel_futures=True) needs Python 3.9
+            for f in futures:
+                f.cancel()
+            if pool is not None:
+                pool.shutdown(wait=False)
             raise
+        if pool is not None:
+            pool.shutdown(wait=True)
         return ', '.join(["%d %s" % (count[_], _.lower())
                           for _ in self.get_pipeline().states.order if _ in count])
 
@@ -907,26 +1046,29 @@ class AbstractStep(object):
         if len(self._pipeline_log) == 0:
             self._pipeline_log = log
         else:
-            for k in log.keys():
+            for k, entry in log.items():
+                dst = self._pipeline_log[k]
                 if k == 'process_watcher':
-                    for k2 in log[k].keys():
+                    for k2, value in entry.items():
                         if k2 == 'max':
-                            for _ in log[k][k2].keys():
-                                if _ == 'sum':
-                                    for k3 in self._pipeline_log[k][k2][_].keys():
-                                        self._pipeline_log[k][k2][_][k3] = \
-                                            max(self._pipeline_log[k][k2][_][k3],
-                                                log[k][k2][_][k3])
+                            dst_max = dst[k2]
+                            for k3, watched in value.items():
+                                if k3 == 'sum':
+                                    dst_sum = dst_max[k3]
+                                    for k4, v in watched.items():
+                                        cur = dst_sum.get(k4)
+                                        if cur is None or cur < v:
+                                            dst_sum[k4] = v
                                 else:
-                                    self._pipeline_log[k][k2][_] = log[k][k2][_]
+                                    dst_max[k3] = watched
                         else:
-                            self._pipeline_log[k][k2].update(log[k][k2])
+                            dst[k2].update(value)
 
                 else:
-                    if log[k].__class__ == list:
-                        self._pipeline_log[k].extend(log[k])
+                    if entry.__class__ == list:
+                        dst.extend(entry)
                     else:
-                        self._pipeline_log[k].update(log[k])
+                        dst.update(entry)
 
     def __str__(self):
         return self._step_name
@@ -938,23 +1080,7 @@ class AbstractStep(object):
         to the name of the module the class is defined in. Pass 'cutadapt' and
         you will get the cutadapt.Cutadapt class which you may then instantiate.
         """
-
-        check_classes = [AbstractSourceStep, AbstractStep]
-        for index, c in enumerate(check_classes):
-
-            classes = [_ for _ in inspect.getmembers(__import__(key),
-                                                     inspect.isclass)
-                       if c in _[1].__bases__]
-
-            for k in range(index):
-                classes = [_ for _ in classes if _[1] != check_classes[k]]
-            if len(classes) > 0:
-                if len(classes) != 1:
-                    raise UAPError("need exactly one subclass of %s in %s"
-                                   % (c, key))
-                return classes[0][1]
-
-        raise UAPError("No suitable class found for module %s." % key)
+        return _resolve_step_class(key)
 
     def set_cores(self, cores):
         """
@@ -998,11 +1124,12 @@ class AbstractStep(object):
             self._optional_connections.add(connection)
         else:
             self._connections.add(connection)
+        self._connections_cache.clear()
         if format is not None:
             self._connection_formats[connection] = format
         if description is not None:
             self._connection_descriptions[connection] = \
-                re.sub(r'\s+', ' ', description)
+                _WS_SEQ_RE.sub(' ', description)
 
     def get_connections(self, with_optional=True):
         """
@@ -1013,65 +1140,59 @@ class AbstractStep(object):
             connections = connections.union(self._optional_connections)
         return connections
 
+    def _get_prefixed_connections(self, prefix, with_optional, strip_prefix):
+        key = (prefix, with_optional, strip_prefix)
+        try:
+            return self._connections_cache[key]
+        except KeyError:
+            pass
+        connections = self._connections
+        if with_optional is True:
+            connections = connections.union(self._optional_connections)
+        if strip_prefix is True:
+            n = len(prefix)
+            result = frozenset(c[n:] for c in connections
+                               if c.startswith(prefix))
+        else:
+            result = frozenset(c for c in connections if c.startswith(prefix))
+        self._connections_cache[key] = result
+        return result
+
     def get_in_connections(self, with_optional=True, strip_prefix=False):
         """
         Return all in-connections for this step
         """
-        connections = self._connections.copy()
-        if with_optional is True:
-            connections = connections.union(self._optional_connections)
-        in_connections = set()
-        for connection in connections:
-            if connection[0:3] == "in/":
-                if strip_prefix is True:
-                    con = connection[3:]
-                else:
-                    con = connection
-                in_connections.add(con)
-        return in_connections
+        return self._get_prefixed_connections('in/', with_optional,
+                                              strip_prefix)
 
     def get_out_connections(self, with_optional=True, strip_prefix=False):
         """
         Return all out-connections for this step
         """
-        connections = self._connections.copy()
-        if with_optional is True:
-            connections = connections.union(self._optional_connections)
-        out_connections = set()
-        for connection in connections:
-            if connection[0:4] == "out/":
-                if strip_prefix is True:
-                    con = connection[4:]
-                else:
-                    con = connection
-                out_connections.add(con)
-        return out_connections
+        return self._get_prefixed_connections('out/', with_optional,
+                                              strip_prefix)
 
     def require_tool(self, tool):
         """
         Declare that this step requires an external tool. Query it later with
         *get_tool()*.
         """
-        if self.get_pipeline() is not None:
-            if tool not in self.get_pipeline().config['tools']:
+        pipeline = self.get_pipeline()
+        if pipeline is not None:
+            tools_config = pipeline.config['tools']
+            if tool not in tools_config:
                 raise UAPError(
                     "%s requires the tool %s but it's not declared in "
                     "the configuration." %
                     (self, tool))
-            self._tools[tool] = self.get_pipeline(
-            ).config['tools'][tool]['path']
-            if 'pre_command' in self.get_pipeline().config['tools'][tool]:
-                self._pre_command[tool] = self.get_pipeline(
-                ).config['tools'][tool]['pre_command']
-            if 'module_load' in self.get_pipeline().config['tools'][tool]:
-                self._module_load[tool] = self.get_pipeline(
-                ).config['tools'][tool]['module_load']
-            if 'module_unload' in self.get_pipeline().config['tools'][tool]:
-                self._module_unload[tool] = self.get_pipeline(
-                ).config['tools'][tool]['module_unload']
-            if 'post_command' in self.get_pipeline().config['tools'][tool]:
-                self._post_command[tool] = self.get_pipeline(
-                ).config['tools'][tool]['post_command']
+            tool_config = tools_config[tool]
+            self._tools[tool] = tool_config['path']
+            for key, commands in (('pre_command', self._pre_command),
+                                  ('module_load', self._module_load),
+                                  ('module_unload', self._module_unload),
+                                  ('post_command', self._post_command)):
+                if key in tool_config:
+                    commands[tool] = tool_config[key]
         else:
             self._tools[tool] = True
 
@@ -1079,11 +1200,9 @@ class AbstractStep(object):
         """
         Add an option. Multiple types may be specified.
         """
-        if 'optional' not in kwargs:
-            kwargs['optional'] = False
-        for _ in ['default', 'description', 'choices']:
-            if _ not in kwargs:
-                kwargs[_] = None
+        kwargs.setdefault('optional', False)
+        for _ in _OPTION_KW_DEFAULTS:
+            kwargs.setdefault(_, None)
 
         if key[0] == '_':
             raise UAPError(
@@ -1098,7 +1217,7 @@ class AbstractStep(object):
                 "are defined (%s)." %
                 key)
         for option_type in option_types:
-            if option_type not in [int, float, str, bool, list, dict]:
+            if option_type not in _ALLOWED_OPTION_TYPES:
                 raise UAPError("Invalid type for option %s: %s."
                                % (key, option_type))
         if kwargs['optional'] and (kwargs['default'] is not None):
@@ -1119,25 +1238,29 @@ class AbstractStep(object):
                     'The description of option %s in step %s is not a string.' %
                     (key, self))
             # collapse whites spaces
-            info['description'] = re.sub(r'\s+', ' ', info['description'])
+            info['description'] = _WS_SEQ_RE.sub(' ', info['description'])
 
         self._defined_options[key] = info
 
     def find_upstream_info_for_input_paths_as_set(self, input_paths,
                                                   key, expected=1):
-        task_ids = set()
-        for path in input_paths:
-            task_ids.add(self.get_pipeline().task_id_for_output_file[path])
+        pipeline = self.get_pipeline()
+        task_id_for_output_file = pipeline.task_id_for_output_file
+        # breadth-first, each upstream task is visited only once
+        queue = deque(task_id_for_output_file[path] for path in input_paths)
+        visited = set()
         results = set()
-        for task_id in task_ids:
-            task = self.get_pipeline().task_for_task_id[task_id]
-            step = task.step
-            run_id = task.run_id
-            run = step._runs[run_id]
+        while queue:
+            task_id = queue.popleft()
+            if task_id in visited:
+                continue
+            visited.add(task_id)
+            task = pipeline.task_for_task_id[task_id]
+            run = task.step._runs[task.run_id]
             if run.has_public_info(key):
                 results.add(run.get_public_info(key))
-            results |= self.find_upstream_info_for_input_paths_as_set(
-                task.input_files(), key, None)
+            queue.extend(task_id_for_output_file[path]
+                         for path in task.input_files())
 
         if expected is not None:
             if len(results) != expected:
@@ -1171,48 +1294,53 @@ class AbstractStep(object):
         absolute.
         '''
 
-        cc = ConnectionsCollector(self.get_step_name())
-        self._options.setdefault('_connect', dict())
+        step_name = self.get_step_name()
+        cc = ConnectionsCollector(step_name)
+        connect = self._options.setdefault('_connect', dict())
+        in_connections = self.get_in_connections()
 
         # Check if set in-connections are defined in the step class
         # and collect out connections for later check.
         set_out_connections = set()
         used_out_connections = set()
-        for in_conn, out_conn in self._options['_connect'].items():
-            if in_conn not in self.get_in_connections():
+        for in_conn, out_conn in connect.items():
+            if in_conn not in in_connections:
                 raise UAPError('_connect: unknown input connection "%s" '
                                'found. Available connections are %s' %
-                               (in_conn, list(self.get_in_connections())))
-            out_conn = out_conn if isinstance(out_conn, list) else [out_conn]
-            set_out_connections = set_out_connections.union(set(out_conn))
+                               (in_conn, list(in_connections)))
+            if isinstance(out_conn, list):
+                set_out_connections.update(out_conn)
+            else:
+                set_out_connections.add(out_conn)
 
         if 'empty' in set_out_connections:
             logger.warning(
                 '[%s] "empty" in _connect is deprecated and will be '
                 'ignored.' %
-                self.get_step_name())
+                step_name)
             set_out_connections.discard('empty')
 
         # For each parent step ...
         for parent in self.get_dependencies():
+            parent_name = parent.get_step_name()
             if not parent.get_runs():
                 raise UAPError('The step "%s" produces no output.' %
-                               parent.get_step_name())
+                               parent_name)
             logger.debug('Connecting "%s" to "%s".' %
-                         (parent.get_step_name(), self.get_step_name()))
+                         (parent_name, step_name))
             # ... look for connection to add
-            used_conns = cc.connect(parent, self, self._options['_connect'])
+            used_conns = cc.connect(parent, self, connect)
             if not used_conns:
                 # ... or add connections with the same name.
                 logger.debug('Parent "%s" not connected to child "%s". '
                              'Hence connecting equally named connections.' %
-                             (parent.get_step_name(), self.get_step_name()))
+                             (parent_name, step_name))
                 used_conns = cc.connect(parent, self)
             if not used_conns:
                 raise UAPError('No connections could be made between '
                                '"%s" and its dependency "%s".' %
-                               (self.get_step_name(), parent.get_step_name()))
-            used_out_connections = used_out_connections.union(used_conns)
+                               (step_name, parent_name))
+            used_out_connections.update(used_conns)
 
         # Check if all required connections are sattisfied.
         required_connections = self.get_in_connections(with_optional=False)
@@ -1223,7 +1351,7 @@ class AbstractStep(object):
                 '"%s" is not satisfied. To remove this warning pass '
                 'optional=True to the add_connection method in the step '
                 'constructor __init__ of "%s".' %
-                (missing, self.get_step_type(), self.get_step_type()))
+                (set(missing), self.get_step_type(), self.get_step_type()))
             logger.warning(
                 '[Deprecation] Unmet required connections may trigger '
                 'an error in future version of the UAP.')
@@ -1233,7 +1361,7 @@ class AbstractStep(object):
         if len(unrecognized) > 0:
             raise UAPError('For the following connections into step "%s" '
                            'no parent run could be found: %s.' %
-                           (self.get_step_name(), list(unrecognized)))
+                           (step_name, list(unrecognized)))
 
         return cc
 
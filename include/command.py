@@ -122,7 +122,8 @@ class CommandInfo(object):
         # replace tool call with its name
         cmd = self.get_command()
         map = self.get_run().get_step().get_path_tool()
-        tool = map.get(' '.join(cmd[0]))
+        head = cmd[0]
+        tool = map.get(head if isinstance(head, str) else ' '.join(head))
         if tool is None:
             tool = cmd[0]
             for path, tool in map.items():
@@ -1,5 +1,10 @@
 import os
+import threading
 import yaml
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 import misc
 
 
@@ -22,62 +27,86 @@ class FSCache:
         print(fsc.exists('/home'))
 
     You may call any method which is available in os.path.
+
+    The cache may be shared by threads. The calls themselves are made
+    without holding the lock, so two threads may both make the same call.
     '''
 
     def __init__(self):
         self.cache = dict()
+        self._methods = dict()
+        self._lock = threading.RLock()
+
+    def get(self, name, key, func):
+        '''
+        Returns the result cached for *key* in the cache *name* or calls
+        *func* without arguments to fill it in.
+        '''
+        with self._lock:
+            try:
+                return self.cache[name][key]
+            except KeyError:
+                pass
+        result = func()
+        with self._lock:
+            return self.cache.setdefault(name, dict()).setdefault(key, result)
 
     def load_yaml_from_file(self, path):
-        if 'load_yaml_from_file' not in self.cache:
-            self.cache['load_yaml_from_file'] = dict()
-
-        if path in self.cache['load_yaml_from_file']:
-            return self.cache['load_yaml_from_file'][path]
-
-        f = open(path, 'r')
-        data = yaml.load(f, Loader=yaml.FullLoader)
-        f.close()
-        self.cache['load_yaml_from_file'][path] = data
-        return data
+        def load():
+            with open(path, 'rb') as f:
+                return yaml.load(f, Loader=SafeLoader)
+        return self.get('load_yaml_from_file', path, load)
 
     def sha256sum_of(self, path, value=None):
-        if 'sha256sums' not in self.cache:
-            self.cache['sha256sums'] = dict()
-
         if value is not None:
-            self.cache['sha256sums'][path] = value
+            with self._lock:
+                self.cache.setdefault('sha256sums', dict())[path] = value
             return value
-
-        if path in self.cache['sha256sums']:
-            return self.cache['sha256sums'][path]
-
-        sha = misc.sha256sum_of(path)
-        self.cache['sha256sums'][path] = sha
-        return sha
+        return self.get('sha256sums', path,
+                        lambda: misc.sha256sum_of(path))
+
+    def stat(self, path):
+        '''
+        Calls os.stat once and also caches the matching exists, getsize
+        and getmtime results, so later os.path lookups agree with it.
+        '''
+        with self._lock:
+            try:
+                return self.cache['stat'][path]
+            except KeyError:
+                pass
+
+        st = os.stat(path)
+        args = (path,)
+        with self._lock:
+            self.cache.setdefault('stat', dict())[path] = st
+            self.cache.setdefault('exists', dict())[args] = True
+            self.cache.setdefault('getsize', dict())[args] = st.st_size
+            self.cache.setdefault('getmtime', dict())[args] = st.st_mtime
+        return st
 
     def clear(self):
-        self.cache = dict()
+        with self._lock:
+            self.cache = dict()
 
     def __getattr__(self, name):
+        if name.startswith('__') or name in ('_methods', '_lock'):
+            raise AttributeError(name)
+        try:
+            return self._methods[name]
+        except KeyError:
+            pass
+        try:
+            func = getattr(os.path, name)
+        except AttributeError:
+            raise AttributeError(
+                "Module os.path has no method '%s'" %
+                name)
 
         def method(*args):
-
             # if the function was already called with the same args, return
-            # the result from the cache
-            if name in self.cache:
-                if args in self.cache[name]:
-                    return self.cache[name][args]
-
-            # otherwise, make the call and store the result in the cache
-            try:
-                result = getattr(os.path, name)(*args)
-                if name not in self.cache:
-                    self.cache[name] = dict()
-                self.cache[name][args] = result
-                return result
-            except AttributeError:
-                raise AttributeError(
-                    "Module os.path has no method '%s'" %
-                    name)
+            # the result from the cache, otherwise make the call and store it
+            return self.get(name, args, lambda: func(*args))
 
+        self._methods[name] = method
         return method
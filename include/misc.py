@@ -3,6 +3,7 @@ import sys
 import hashlib
 import json
 from logging import getLogger
+import mmap
 import os
 import re
 import signal
@@ -192,16 +193,21 @@ def sha256sum_of(file):
     """
     sha256sum = hashlib.sha256()
     try:
-        with open(file, 'rb') as f:
+        with open(file, 'rb', buffering=0) as f:
+            if hasattr(hashlib, 'file_digest'):
+                # Python >= 3.11 hashes the file in a C loop
+                return hashlib.file_digest(f, 'sha256').hexdigest()
             # the below exception is raised for large files
             # this workaround reads the file in chunks and
             # updates the sha256sum
+            # read file in 2MB chunks into one reused buffer
+            buf = bytearray(2 * 1024 * 1024)
+            view = memoryview(buf)
             while True:
-                # read file in 2MB chunks
-                buf = f.read(2 * 1024 * 1024)
-                if not buf:
+                n = f.readinto(buf)
+                if not n:
                     break
-                sha256sum.update(buf)
+                sha256sum.update(view[:n])
     except BaseException:
         raise UAPError("Error while calculating SHA256sum "
                        "of %s" % file)
@@ -209,6 +215,40 @@ def sha256sum_of(file):
     return sha256sum.hexdigest()
 
 
+def sha256sum_of_mmap(file):
+    """
+    Returns hexdigits of the sha256sum of the passed file. The file is
+    memory-mapped and fed to hashlib in 2MB slices without copying.
+    """
+    chunk_size = 2 * 1024 * 1024
+    sha256sum = hashlib.sha256()
+    try:
+        with open(file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # empty files cannot be mapped
+            if size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mm, 'madvise'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    with memoryview(mm) as view:
+                        for offset in range(0, size, chunk_size):
+                            sha256sum.update(
+                                view[offset:offset + chunk_size])
+    except BaseException:
+        raise UAPError("Error while calculating SHA256sum "
+                       "of %s" % file)
+
+    return sha256sum.hexdigest()
+
+
+def sha_and_file_mmap(file):
+    '''
+    Designed to be run in a ThreadPoolExecutor. Unlike sha_and_file it
+    does not touch signal handlers, which is only allowed in the main thread.
+    '''
+    return sha256sum_of_mmap(file), file
+
+
 def sha_and_file(file):
     '''
     Designed to be run in multiprocessing.Pool().imap.
@@ -31,13 +31,8 @@ def cache(func):
     @wraps(func)
     def inner(self, *args, **kwargs):
         key = str(function_name + [args, kwargs])
-        cache = self.fsc.cache
-        if key in cache:
-            result = cache[key]
-        else:
-            result = func(self, *args, **kwargs)
-            cache[key] = result
-        return result
+        return self.fsc.get('run methods', key,
+                            lambda: func(self, *args, **kwargs))
     return inner
 
 
@@ -78,6 +73,10 @@ class Run(object):
         self._public_info = dict()
         self._input_files = set()
         self._output_files = dict()
+        self._output_files_abspath = None
+        '''
+        Cached result of get_output_files_abspath().
+        '''
         out_conns = self._step.get_out_connections(with_optional=False)
         for out_connection in out_conns:
             self.add_out_connection(out_connection)
@@ -102,6 +101,10 @@ class Run(object):
         '''
         List of temporary paths which can be either files or paths
         '''
+        self._temp_file_contents = dict()
+        '''
+        Contents of temporary files which are written when the run starts.
+        '''
         self._temp_directory = None
         '''
         Contains path to currently used temporary directory if set.
@@ -116,6 +119,7 @@ class Run(object):
 
     def reset_fsc(self):
         self.fsc.clear()
+        self._output_files_abspath = None
 
     def new_exec_group(self):
         eg = exec_group.ExecGroup(self)
@@ -185,6 +189,13 @@ class Run(object):
         '''
         return self._temp_paths
 
+    def get_temp_file_contents(self):
+        '''
+        Returns a dict with the content of each temporary file which is
+        written before the commands of this run are executed.
+        '''
+        return self._temp_file_contents
+
     def get_output_directory_du_jour_placeholder(self):
         '''
         Used to return a placeholder for the temporary output directory, which
@@ -222,6 +233,7 @@ class Run(object):
         Included are:
          - tool versions
          - commands and structure
+         - content of temporary files written before the commands
          - output connections and files
          - parent run names and hashsum of their run_structure
 
@@ -286,6 +298,11 @@ class Run(object):
                     cmd_by_eg[eg_name]['command %s' % pipe_count] = \
                         poc.get_command_string(replace_path=True)
 
+        # files written by uap itself are no command argument
+        if self._temp_file_contents:
+            cmd_by_eg['temporary file contents'] = \
+                dict(self._temp_file_contents)
+
         return cmd_by_eg
 
     def get_changes(self):
@@ -614,11 +631,14 @@ class Run(object):
         logger.debug('Adding files %s as for connection %s in %s for run %s.' % (
             out_path, out_connection, str(self.get_step()), self.get_run_id()))
         self._output_files[out_connection][out_path] = in_paths
+        self._output_files_abspath = None
         return out_path
 
-    def add_temporary_file(self, prefix='temp', suffix='', designation=None):
+    def add_temporary_file(self, prefix='temp', suffix='', designation=None,
+                           content=None):
         '''
-        Returns the name of a temporary file.
+        Returns the name of a temporary file. If *content* is given, the
+        file is written with it before the commands of the run start.
         '''
         count = len(self._temp_paths)
         count = 0
@@ -643,6 +663,8 @@ class Run(object):
         # _temp_paths set contains all temporary files which are going to be
         # deleted
         self._temp_paths.add(temp_name)
+        if content is not None:
+            self._temp_file_contents[temp_name] = content
         return temp_name
 
     def add_temporary_directory(self, prefix='', suffix='',
@@ -731,6 +753,7 @@ class Run(object):
                 % out_connection)
 
         self._output_files[out_connection][None] = None
+        self._output_files_abspath = None
 
     def add_out_connection(self, out_connection):
         if not out_connection.startswith('out/'):
@@ -744,6 +767,7 @@ class Run(object):
         logger.debug('Adding %s to %s in run %s.' %
                      (out_connection, str(self.get_step()), self.get_run_id()))
         self._output_files[out_connection] = dict()
+        self._output_files_abspath = None
         return out_connection
 
     def get_input_files_for_output_file(self, output_file):
@@ -782,8 +806,11 @@ class Run(object):
            annotation_2: ...
 
         The ``out_path`` consists of the output directory du jour and the output
-        file name.
+        file name. The result is cached until the output files change or
+        reset_fsc() is called.
         '''
+        if self._output_files_abspath is not None:
+            return self._output_files_abspath
         result = dict()
         for connection in self._output_files.keys():
             result[connection] = dict()
@@ -797,6 +824,7 @@ class Run(object):
                     pass
                 result[connection][full_path] = in_paths
 
+        self._output_files_abspath = result
         return result
 
     def get_output_files_for_annotation_and_tags(self, annotation, tags):
@@ -49,32 +49,38 @@ class RawFileSource(AbstractSourceStep):
 
             # find files matching the 'group' pattern in all files matching
             # 'pattern'
-            for path in glob.glob(os.path.abspath(self.get_option('pattern'))):
+            pattern = os.path.abspath(self.get_option('pattern'))
+            if self.is_option_set_in_config('sample_id_prefix'):
+                prefix_parts = [self.get_option('sample_id_prefix')]
+            else:
+                prefix_parts = []
+            for path in glob.iglob(pattern):
                 match = regex.match(os.path.basename(path))
                 if match is None:
                     raise StepError(self, "Couldn't match regex /%s/ to file %s."
                                    % (self.get_option('group'),
                                       os.path.basename(path)))
 
-                sample_id_parts = []
-                if self.is_option_set_in_config('sample_id_prefix'):
-                    sample_id_parts.append(self.get_option('sample_id_prefix'))
-
-                sample_id_parts += list(match.groups())
-                sample_id = '_'.join(sample_id_parts)
-                if sample_id not in found_files:
-                    found_files[sample_id] = list()
-                found_files[sample_id].append(path)
+                sample_id = '_'.join(prefix_parts + list(match.groups()))
+                found_files.setdefault(sample_id, []).append(path)
 
         elif self.is_option_set_in_config('sample_to_files_map'):
+            # list each directory once instead of a stat per file
+            files_in_dir = dict()
             for run_id, paths in self.get_option(
                     'sample_to_files_map').items():
                 for path in paths:
-                    if not os.path.isfile(path):
+                    directory = os.path.dirname(path) or '.'
+                    if directory not in files_in_dir:
+                        try:
+                            with os.scandir(directory) as entries:
+                                files_in_dir[directory] = {
+                                    e.name for e in entries if e.is_file()}
+                        except OSError:
+                            files_in_dir[directory] = set()
+                    if os.path.basename(path) not in files_in_dir[directory]:
                         raise StepError(self, "[raw_file_source]: %s is no file. "
                                        "Please provide correct path." % path)
-                if run_id not in found_files:
-                    found_files[run_id] = list()
                 found_files[run_id] = paths
 
         else:
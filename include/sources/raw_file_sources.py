@@ -46,22 +46,20 @@ class RawFileSources(AbstractSourceStep):
         found_files = dict()
 
         # find files
-        for path in glob.glob(os.path.abspath(self.get_option('pattern'))):
+        pattern = os.path.abspath(self.get_option('pattern'))
+        if self.is_option_set_in_config('sample_id_prefix'):
+            prefix_parts = [self.get_option('sample_id_prefix')]
+        else:
+            prefix_parts = []
+        for path in glob.iglob(pattern):
             match = regex.match(os.path.basename(path))
             if match is None:
                 raise StepError(self, "Couldn't match regex /%s/ to file %s."
                                % (self.get_option('group'),
                                   os.path.basename(path)))
 
-            sample_id_parts = []
-            if self.is_option_set_in_config('sample_id_prefix'):
-                sample_id_parts.append(self.get_option('sample_id_prefix'))
-
-            sample_id_parts += list(match.groups())
-            sample_id = '_'.join(sample_id_parts)
-            if sample_id not in found_files:
-                found_files[sample_id] = list()
-            found_files[sample_id].append(path)
+            sample_id = '_'.join(prefix_parts + list(match.groups()))
+            found_files.setdefault(sample_id, []).append(path)
 
         # declare a run for every sample
         for run_id, paths in found_files.items():
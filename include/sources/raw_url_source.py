@@ -7,6 +7,11 @@ from abstract_step import AbstractStep
 
 logger = getLogger("uap_logger")
 
+# file endings of gzipped downloads
+_GZIP_EXTS = frozenset({'.gz', '.gzip'})
+# uncompressed payloads that pugz cannot decode in parallel
+_BINARY_EXTS = frozenset({'.bam', '.bcf', '.tar'})
+
 
 class RawUrlSource(AbstractStep):
 
@@ -16,12 +21,9 @@ class RawUrlSource(AbstractStep):
         self.add_connection('out/raw')
 
         self.require_tool('compare_secure_hashes')
-        # Step was tested for cp (GNU coreutils) release 8.25
-        self.require_tool('cp')
+        self.require_tool('fast_cp')
         # Step was tested for curl release 7.47.0
         self.require_tool('curl')
-        # Step was tested for dd (coreutils) release 8.25
-        self.require_tool('dd')
         # Step was tested for mkdir (GNU coreutils) release 8.25
         self.require_tool('mkdir')
         # Step was tested for pigz release 2.3.1
@@ -39,9 +41,30 @@ class RawUrlSource(AbstractStep):
                         description='File is uncompressed after download')
         self.add_option('url', str, optional=False,
                         description="Download URL")
+        self.add_option('download-connections', int, optional=True,
+                        default=1,
+                        description="Number of parallel connections used "
+                        "for the download. More than one requires the tool "
+                        "aria2c instead of curl.")
+
+        self.add_option('decompress-threads', int, optional=True, default=1,
+                        description="Number of threads used to uncompress "
+                        "the download. More than one requires the tool pugz "
+                        "for text files, other files are uncompressed with "
+                        "pigz.")
 
         # Options for dd
-        self.add_option('dd-blocksize', str, optional=True, default="256k")
+        self.add_option('dd-blocksize', str, optional=True, default="256k",
+                        description="Deprecated and ignored, the "
+                        "decompressor writes the file directly.")
+
+    def set_options(self, options):
+        super(RawUrlSource, self).set_options(options)
+        if self.get_option('download-connections') > 1:
+            self.require_tool('aria2c')
+        if self.get_option('uncompress') and \
+           self.get_option('decompress-threads') > 1:
+            self.require_tool('pugz')
 
     def runs(self, run_ids_connections_files):
         # Get file name of downloaded file
@@ -50,7 +73,7 @@ class RawUrlSource(AbstractStep):
 
         # Is downloaded file gzipped?
         root, ext = os.path.splitext(url_filename)
-        is_gzipped = True if ext in ['.gz', '.gzip'] else False
+        is_gzipped = ext in _GZIP_EXTS
         if not is_gzipped and self.get_option('uncompress'):
             raise StepError(self, "Uncompression of non-gzipped file %s requested."
                            % url_filename)
@@ -65,7 +88,7 @@ class RawUrlSource(AbstractStep):
                 os.path.basename(conf_filename))
 
             if is_gzipped and self.get_option('uncompress') and \
-               ext in ['.gz', '.gzip']:
+               ext in _GZIP_EXTS:
                 raise StepError(self, "The filename %s should NOT end on '.gz' or "
                                "'.gzip'." % conf_filename)
             filename = conf_filename
@@ -74,40 +97,70 @@ class RawUrlSource(AbstractStep):
             out_file = run.add_output_file('raw', filename, [])
 
             temp_filename = run.add_temporary_file(suffix=url_filename)
-            with run.new_exec_group() as curl_exec_group:
-                # 1. download file
-                curl = [self.get_tool('curl'),
-                        '--output', temp_filename,
-                        self.get_option('url')]
-                curl_exec_group.add_command(curl)
-
-            if self.is_option_set_in_config('hashing-algorithm') and \
-               self.is_option_set_in_config('secure-hash'):
-                with run.new_exec_group() as check_exec_group:
-                    # 2. Compare secure hashes
-                    compare_secure_hashes = [
-                        self.get_tool('compare_secure_hashes'),
-                        '--algorithm',
-                        self.get_option('hashing-algorithm'),
-                        '--secure-hash',
-                        self.get_option('secure-hash'),
-                        temp_filename
-                    ]
-                    check_exec_group.add_command(compare_secure_hashes)
+            check_hash = self.is_option_set_in_config('hashing-algorithm') \
+                and self.is_option_set_in_config('secure-hash')
+            if check_hash:
+                compare_secure_hashes = [
+                    self.get_tool('compare_secure_hashes'),
+                    '--algorithm',
+                    self.get_option('hashing-algorithm'),
+                    '--secure-hash',
+                    self.get_option('secure-hash')
+                ]
+            connections = self.get_option('download-connections')
+            if check_hash and connections == 1:
+                with run.new_exec_group() as curl_exec_group:
+                    # 1. download file and compare secure hashes while it
+                    #    is written
+                    with curl_exec_group.add_pipeline() as pipe:
+                        curl = [self.get_tool('curl'),
+                                self.get_option('url')]
+                        pipe.add_command(curl)
+                        pipe.add_command(compare_secure_hashes +
+                                         ['--write-to', temp_filename, '-'])
+            else:
+                with run.new_exec_group() as curl_exec_group:
+                    # 1. download file
+                    if connections > 1:
+                        # ranged requests over several connections,
+                        # aria2c resolves --out relative to --dir
+                        download = [self.get_tool('aria2c'),
+                                    '-x', str(connections),
+                                    '-s', str(connections),
+                                    '--file-allocation=none',
+                                    '-d', os.path.dirname(temp_filename)
+                                    or '.',
+                                    '-o', os.path.basename(temp_filename),
+                                    self.get_option('url')]
+                    else:
+                        download = [self.get_tool('curl'),
+                                    '--output', temp_filename,
+                                    self.get_option('url')]
+                    curl_exec_group.add_command(download)
+
+                if check_hash:
+                    with run.new_exec_group() as check_exec_group:
+                        # 2. Compare secure hashes
+                        check_exec_group.add_command(
+                            compare_secure_hashes + [temp_filename])
             with run.new_exec_group() as cp_exec_group:
                 if self.get_option("uncompress"):
-                    with cp_exec_group.add_pipeline() as pipe:
+                    threads = self.get_option('decompress-threads')
+                    # pugz can only decode text payloads in parallel
+                    is_text = os.path.splitext(filename)[1] not in \
+                        _BINARY_EXTS
+                    if threads > 1 and is_text:
+                        pigz = [self.get_tool('pugz'),
+                                '-t', str(threads),
+                                temp_filename]
+                    else:
                         pigz = [self.get_tool('pigz'),
                                 '--decompress',
                                 '--stdout',
-                                '--processes', '1',
+                                '--processes', str(threads),
                                 temp_filename]
-                        dd_out = [self.get_tool('dd'),
-                                  'bs=%s' % self.get_option('dd-blocksize'),
-                                  'of=%s' % out_file]
-                        pipe.add_command(pigz)
-                        pipe.add_command(dd_out)
+                    cp_exec_group.add_command(pigz, stdout_path=out_file)
                 else:
-                    cp = [self.get_tool('cp'), '--update', temp_filename,
+                    cp = [self.get_tool('fast_cp'), temp_filename,
                           out_file]
                     cp_exec_group.add_command(cp)
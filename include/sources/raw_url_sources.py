@@ -7,6 +7,16 @@ from abstract_step import AbstractStep
 
 logger = getLogger("uap_logger")
 
+# file endings of gzipped downloads
+_GZIP_EXTS = frozenset({'.gz', '.gzip'})
+
+# valid and mandatory keys of a download in 'run-download-info'
+_DOWNLOAD_OPTS = frozenset({'filename', 'hashing-algorithm',
+                            'secure-hash', 'uncompress', 'url'})
+_MANDATORY_OPTS = frozenset({'filename', 'url'})
+_HASH_ALGOS = ('md5', 'sha1', 'sha224', 'sha256', 'sha384', 'sha512')
+_VALID_HASH_ALGOS = frozenset(_HASH_ALGOS + (None,))
+
 
 class RawUrlSource(AbstractStep):
 
@@ -16,7 +26,7 @@ class RawUrlSource(AbstractStep):
         self.add_connection('out/raw')
 
         self.require_tool('compare_secure_hashes')
-        self.require_tool('cp')
+        self.require_tool('fast_cp')
         self.require_tool('curl')
         self.require_tool('dd')
         self.require_tool('pigz')
@@ -42,72 +52,59 @@ class RawUrlSource(AbstractStep):
         # Sanity check the 'file-download-map'
         file_download = self.get_option('run-download-info')
 
-        # List with valid download options
-        download_opts = {'filename', 'hashing-algorithm',
-                         'secure-hash', 'uncompress', 'url'}
-        mandatory_opts = {'filename', 'url'}
+        # look up the tools once for all downloads
+        curl_tool = self.get_tool('curl')
+        compare_tool = self.get_tool('compare_secure_hashes')
+        pigz_tool = self.get_tool('pigz')
+        dd_tool = self.get_tool('dd')
+        cp_tool = self.get_tool('fast_cp')
 
         for files, downloads in file_download.items():
             # Control input for unknown options
-            unknown_opts = set(downloads.keys()).difference(download_opts)
+            unknown_opts = downloads.keys() - _DOWNLOAD_OPTS
             if len(unknown_opts) > 0:
                 raise StepError(self, "Unknown option(s) %s for download of %s"
                                % (" ".join(unknown_opts), files))
             # Control input for missing mandatory options
-            missing_mandatory_opts = mandatory_opts.difference(set(
-                downloads.keys()))
+            missing_mandatory_opts = _MANDATORY_OPTS - downloads.keys()
             if len(missing_mandatory_opts) > 0:
                 raise StepError(self, "Download of %s misses mandatory option(s): %s"
                                % (files, " ".join(missing_mandatory_opts)))
 
-            # Check the optional parameters and set default if not available
-            downloads['hashing-algorithm'] = downloads.get('hashing-algorithm')
-            downloads['secure-hash'] = downloads.get('secure-hash')
-            downloads['uncompress'] = downloads.get('uncompress', False)
+            # Read each field once and set defaults for the optional ones
+            url = downloads['url']
+            filename = downloads['filename']
+            algo = downloads.get('hashing-algorithm')
+            secure_hash = downloads.get('secure-hash')
+            uncompress = downloads.get('uncompress', False)
 
             # 1. Check the 'hashing-algorithm'
-            hash_algos = [
-                'md5',
-                'sha1',
-                'sha224',
-                'sha256',
-                'sha384',
-                'sha512',
-                None]
-            if downloads['hashing-algorithm'] not in hash_algos:
+            if algo not in _VALID_HASH_ALGOS:
                 raise StepError(self, "Option 'hashing-algorithm' for download %s "
                                "has invalid value %s. Has to be one of %s."
-                               % (files, downloads['hashing-algorithm'],
-                                  ", ".join(hash_algos)))
+                               % (files, algo,
+                                  ", ".join(_HASH_ALGOS)))
 
             # 2. Check the 'secure-hash'
-            if isinstance(downloads['secure-hash'], str) and not \
-                    downloads['hashing-algorithm']:
+            if isinstance(secure_hash, str) and not algo:
                 raise StepError(self, "Option 'secure-hash' set for download %s "
                                "but option 'hashing-algorithm' is missing."
                                % files)
 
             # Get file name of downloaded file
             url_filename = os.path.basename(
-                urllib.parse.urlparse(downloads['url']).path)
+                urllib.parse.urlparse(url).path)
 
             # Is downloaded file gzipped?
-            root, ext = os.path.splitext(url_filename)
-            is_gzipped = True if ext in ['.gz', '.gzip'] else False
-            if not is_gzipped and downloads['uncompress']:
+            ext = os.path.splitext(url_filename)[1]
+            is_gzipped = ext in _GZIP_EXTS
+            if not is_gzipped and uncompress:
                 raise StepError(self,
                     "Uncompression of non-gzipped file %s requested." %
                     url_filename)
-            # Handle the filename to have the proper ending
-            filename = root if downloads['uncompress'] and is_gzipped \
-                else url_filename
-
-            filename = downloads['filename']
-            root, ext = os.path.splitext(
-                os.path.basename(filename))
-
-            if is_gzipped and downloads['uncompress'] and \
-               ext in ['.gz', '.gzip']:
+            # The configured filename must not keep the compression ending
+            if uncompress and \
+               os.path.splitext(filename)[1] in _GZIP_EXTS:
                 raise StepError(self, "The filename %s should NOT end on '.gz' or "
                                "'.gzip'." % filename)
 
@@ -117,33 +114,33 @@ class RawUrlSource(AbstractStep):
                 temp_filename = run.add_temporary_file(suffix = url_filename)
                 with run.new_exec_group() as curl_exec_group:
                     # 1. download file
-                    curl = [self.get_tool('curl'), downloads['url']]
+                    curl = [curl_tool, url]
                     curl_exec_group.add_command(
                         curl, stdout_path=temp_filename)
 
-                if downloads['hashing-algorithm'] and downloads['secure-hash']:
+                if algo and secure_hash:
                     with run.new_exec_group() as check_exec_group:
                         # 2. Compare secure hashes
                         compare_secure_hashes = [
-                            self.get_tool('compare_secure_hashes'),
+                            compare_tool,
                             '--algorithm',
-                            downloads['hashing-algorithm'],
+                            algo,
                             '--secure-hash',
-                            downloads['secure-hash'],
+                            secure_hash,
                             temp_filename
                         ]
                         check_exec_group.add_command(compare_secure_hashes)
 
                 with run.new_exec_group() as cp_exec_group:
-                    if downloads["uncompress"]:
+                    if uncompress:
                         with cp_exec_group.add_pipeline() as pipe:
-                            pigz = [self.get_tool('pigz'),
+                            pigz = [pigz_tool,
                                     '--decompress',
                                     '--stdout',
                                     '--processes', '1',
                                     temp_filename]
                             dd_out = [
-                                self.get_tool('dd'),
+                                dd_tool,
                                 'bs=%s' %
                                 self.get_option('dd-blocksize'),
                                 'of=%s' %
@@ -151,6 +148,6 @@ class RawUrlSource(AbstractStep):
                             pipe.add_command(pigz)
                             pipe.add_command(dd_out)
                     else:
-                        cp = [self.get_tool('cp'), '--update', temp_filename,
+                        cp = [cp_tool, temp_filename,
                               out_file]
                         cp_exec_group.add_command(cp)
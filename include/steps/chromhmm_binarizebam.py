@@ -29,8 +29,7 @@ class ChromHmmBinarizeBam(AbstractStep):
         self.add_connection('out/metrics')
 
         self.require_tool('ChromHMM')
-        self.require_tool('echo')
-        self.require_tool('ln')
+        self.require_tool('ln_many')
 
         self.add_option('chrom_sizes_file', str, optional=False,
                         description="File containing chromosome size "
@@ -147,11 +146,8 @@ class ChromHmmBinarizeBam(AbstractStep):
         option_list = list()
         for option in set_options:
             if isinstance(self.get_option(option), bool):
-                # todo as: condition senseless
                 if self.get_option(option):
                     option_list.append('-%s' % option)
-                else:
-                    option_list.append('-%s' % option)
             else:
                 option_list.append('-%s' % option)
                 option_list.append(str(self.get_option(option)))
@@ -170,28 +166,36 @@ class ChromHmmBinarizeBam(AbstractStep):
         # Cell = key of self.get_option(control)
         # Mark = value of self.get_option(control)
 
+        # look up the tools once for all runs
+        ln_many_tool = self.get_tool('ln_many')
+        chromhmm_tool = self.get_tool('ChromHMM')
+
+        # alignments of every run that has some
+        available = {rid: files['in/alignments'] for rid, files
+                     in run_ids_connections_files.items()
+                     if 'in/alignments' in files}
+
         control_samples = self.get_option('control')
         for control_id, treatment_list in control_samples.items():
             control = control_id
             # Check for existence of control files
             control_files = list()
             if control_id != 'None':
-                try:
-                    control_files = run_ids_connections_files[control_id]['in/alignments']
+                if control_id in available:
+                    control_files = available[control_id]
                     control_id = "-" + control_id
-                except KeyError as e:
+                else:
                     logger.info("Option 'control':\n"
                                 "No control '%s' found.\n" % control_id)
 
             # Check for existence of treatment files
             for tr in treatment_list:
-                treatments = dict()
-                try:
-                    treatments[tr] = run_ids_connections_files[tr]['in/alignments']
-                except KeyError as e:
-                    logger.info("Option 'control':\n"
-                                "No treatment '%s' for control '%s' found."
-                                % (tr, control_id))
+                if tr not in available:
+                    logger.error("Option 'control':\n"
+                                 "No treatment '%s' for control '%s' found."
+                                 % (tr, control_id))
+                    continue
+                treatments = {tr: available[tr]}
 
                 # Assemble rund ID
                 run_id = "%s%s" % (tr, control_id)
@@ -208,17 +212,20 @@ class ChromHmmBinarizeBam(AbstractStep):
 
                     # Create links to all input paths in temp_dir
                     with run.new_exec_group() as exec_group:
+                        ln_many = [ln_many_tool]
                         for files, links in [[control_files, linked_controls], [
                                 treatments[tr], linked_treatments]]:
                             for f in files:
                                 f_basename = os.path.basename(f)
                                 temp_f = run.add_temporary_file(
                                     suffix=f_basename)
-                                ln = [self.get_tool('ln'), '-s', f, temp_f]
-                                exec_group.add_command(ln)
+                                ln_many.extend([f, temp_f])
 
                                 # Save basename of created link
                                 links.append(os.path.basename(temp_f))
+                        # one process for all links
+                        if len(ln_many) > 1:
+                            exec_group.add_command(ln_many)
 
                         logger.info("Controls: %s" %
                                     ", ".join(linked_controls))
@@ -233,16 +240,15 @@ class ChromHmmBinarizeBam(AbstractStep):
                                 for lc in linked_controls:
                                     line += "\t%s" % lc
                             cell_mark_file_content += "%s\n" % line
-                        logger.info(cell_mark_file_content)
-                        echo = [self.get_tool('echo'), cell_mark_file_content]
-
-                        cell_mark_file = run.add_temporary_file(suffix=run_id)
-                        exec_group.add_command(
-                            echo, stdout_path=cell_mark_file)
+                        # written when the run starts, the extra newline
+                        # matches the former echo output
+                        cell_mark_file = run.add_temporary_file(
+                            suffix=run_id,
+                            content=cell_mark_file_content + '\n')
 
                     with run.new_exec_group() as exec_group:
-                        chromhmm = [self.get_tool('ChromHMM'),
-                                    'BinarizeBam',
-                                    self.get_option('chrom_sizes_file'), '.',
-                                    cell_mark_file, '.'
-                                    ]
+                        chromhmm = [chromhmm_tool, 'BinarizeBam']
+                        chromhmm.extend(option_list)
+                        chromhmm.extend([self.get_option('chrom_sizes_file'),
+                                         '.', cell_mark_file, '.'])
+                        exec_group.add_command(chromhmm)
@@ -278,6 +278,13 @@ class Cutadapt(AbstractStep):
 
         self.add_option('dd-blocksize', str, optional=True, default="2M")
         self.add_option('pigz-blocksize', str, optional=True, default="2048")
+        self.add_option('pigz-level', int, optional=True,
+                        choices=list(range(1, 10)),
+                        description="Compression level of the clipped "
+                        "reads. If not set, the pigz default (6) is used. "
+                        "Level 1 is several times faster and suits "
+                        "intermediate files that are decompressed again by "
+                        "the next step.")
 
     def runs(self, cc):
 
@@ -341,35 +348,73 @@ class Cutadapt(AbstractStep):
                 option_list.append('--%s' % option)
                 option_list.append(str(self.get_option(option)))
 
+        # look up the tools once for all runs
+        mkfifo_tool = self.get_tool('mkfifo')
+        pigz_tool = self.get_tool('pigz')
+        dd_tool = self.get_tool('dd')
+        cat_tool = self.get_tool('cat')
+        cutadapt_tool = self.get_tool('cutadapt')
+        fix_qnames_tool = self.get_tool('fix_qnames')
+
+        # make sure that adapter-R1/adapter-R2 or adapter-file are
+        # correctly set
+        # this kind of mutual exclusive option checking is a bit
+        # tedious, so we do it here.
+        if paired_end:
+            if (not self.is_option_set_in_config('adapter-R2') and
+                    not self.is_option_set_in_config('adapter-file')):
+                raise StepError(
+                    self, "Option 'adapter-R2' or 'adapter-file' "
+                    "required because the samples are paired end!")
+
+        if (self.is_option_set_in_config('adapter-file') and
+                self.is_option_set_in_config('adapter-R1')):
+            raise StepError(self,
+                            "Option 'adapter-R1' and 'adapter-file' "
+                            "are both set but are mutually exclusive!")
+        if (not self.is_option_set_in_config('adapter-file') and
+                not self.is_option_set_in_config('adapter-R1')):
+            raise StepError(self,
+                            "Option 'adapter-R1' or 'adapter-file' "
+                            "required to call cutadapt!")
+
+        def finish_adapter(adapter):
+            # create reverse complement if necessary
+            if self.get_option('use_reverse_complement'):
+                complements = adapter.maketrans('acgtACGT', 'tgcaTGCA')
+                adapter = adapter.translate(complements)[::-1]
+
+            # make sure the adapter is looking good
+            if re.search(r'^[ACGT]+$', adapter) is None:
+                raise StepError(self, "Unable to come up with a "
+                                "legit-looking adapter: %s" % adapter)
+            return adapter
+
+        # Resolve the adapter of each read once, only adapters with an
+        # ((INDEX)) placeholder (None here) depend on the run.
+        adapters = dict()
+        for read, read_type in read_types.items():
+            # Do we have adapter sequences as input?
+            if self.is_option_set_in_config('adapter-%s' % read_type):
+                adapter = self.get_option('adapter-%s' % read_type)
+                adapters[read] = None if '((INDEX))' in adapter \
+                    else finish_adapter(adapter)
+            # Or do we have a adapter sequence fasta file?
+            else:
+                adapter_file = os.path.abspath(
+                    self.get_option('adapter-file'))
+                if not os.path.exists(adapter_file):
+                    raise StepError(
+                        self, "File %s containing adapter sequences "
+                        "does not exist." % self.get_option('adapter-file'))
+                adapters[read] = "file:" + adapter_file
+
         for run_id in cc.keys():
             run = self.declare_run(run_id)
             for read in read_types:
                 connection = 'in/%s' % read
                 input_paths = cc[run_id][connection]
 
-                # make sure that adapter-R1/adapter-R2 or adapter-file are
-                # correctly set
-                # this kind of mutual exclusive option checking is a bit
-                # tedious, so we do it here.
-                if read == 'second_read':
-                    if (not self.is_option_set_in_config('adapter-R2') and
-                            not self.is_option_set_in_config('adapter-file')):
-                        raise StepError(
-                            self, "Option 'adapter-R2' or 'adapter-file' "
-                            "required because sample %s is paired end!" %
-                            run_id)
-
-                if (self.is_option_set_in_config('adapter-file') and
-                        self.is_option_set_in_config('adapter-R1')):
-                    raise StepError(self,
-                                    "Option 'adapter-R1' and 'adapter-file' "
-                                    "are both set but are mutually exclusive!")
-                if (not self.is_option_set_in_config('adapter-file') and
-                        not self.is_option_set_in_config('adapter-R1')):
-                    raise StepError(self,
-                                    "Option 'adapter-R1' or 'adapter-file' "
-                                    "required to call cutadapt for sample %s!"
-                                    % run_id)
                 temp_fifos = list()
                 exec_group = run.new_exec_group()
                 for input_path in input_paths:
@@ -377,44 +422,26 @@ class Cutadapt(AbstractStep):
                     temp_fifo = run.add_temporary_file(
                         "fifo-%s" % os.path.basename(input_path))
                     temp_fifos.append(temp_fifo)
-                    mkfifo = [self.get_tool('mkfifo'), temp_fifo]
+                    mkfifo = [mkfifo_tool, temp_fifo]
                     exec_group.add_command(mkfifo)
                     # 2. Output files to fifo
                     if input_path.endswith('fastq.gz'):
-                        with exec_group.add_pipeline() as pigz_pipe:
-                            # 2.1 command: Read file in 4MB chunks
-                            dd_in = [
-                                self.get_tool('dd'),
-                                'ibs=%s' %
-                                self.get_option('dd-blocksize'),
-                                'if=%s' % input_path
-                            ]
-                            # 2.2 command: Uncompress file to fifo
-                            pigz = [self.get_tool('pigz'),
-                                    '--decompress',
-                                    '--processes',
-                                    str(self.get_cores()),
-                                    '--blocksize',
-                                    self.get_option('pigz-blocksize'),
-                                    '--stdout']
-                            # 2.3 command: Write file in 4MB chunks to
-                            #              fifo
-                            dd_out = [
-                                self.get_tool('dd'),
-                                'obs=%s' %
-                                self.get_option('dd-blocksize'),
-                                'of=%s' % temp_fifo
-                            ]
-
-                            pigz_pipe.add_command(dd_in)
-                            pigz_pipe.add_command(pigz)
-                            pigz_pipe.add_command(dd_out)
+                        # 2.1 command: Uncompress file to fifo
+                        pigz = [pigz_tool,
+                                '--decompress',
+                                '--processes',
+                                str(self.get_cores()),
+                                '--blocksize',
+                                self.get_option('pigz-blocksize'),
+                                '--stdout',
+                                input_path]
+                        exec_group.add_command(pigz, stdout_path=temp_fifo)
 
                     elif input_path.endswith('fastq'):
                         # 2.1 command: Read file in 4MB chunks and
                         #              write to fifo in 4MB chunks
                         dd_in = [
-                            self.get_tool('dd'),
+                            dd_tool,
                             'bs=%s' % self.get_option('dd-blocksize'),
                             'if=%s' % input_path,
                             'of=%s' % temp_fifo
@@ -427,55 +454,28 @@ class Cutadapt(AbstractStep):
                 # 3. Read data from fifos
                 with exec_group.add_pipeline() as cutadapt_pipe:
                     # 3.1 command: Read from ALL fifos
-                    cat = [self.get_tool('cat')]
+                    cat = [cat_tool]
                     cat.extend(temp_fifos)
                     cutadapt_pipe.add_command(cat)
 
                     # 3.2 command: Fix qnames if user wants us to
                     if self.get_option('fix_qnames'):
-                        fix_qnames = [self.get_tool('fix_qnames')]
+                        fix_qnames = [fix_qnames_tool]
                         cutadapt_pipe.add_command(fix_qnames)
 
-                    # Let's get the correct adapter sequences or
+                    # Let's get the correct adapter sequence or
                     # adapter sequence fasta file
-                    adapter = None
-                    # Do we have adapter sequences as input?
-                    if self.is_option_set_in_config('adapter-%s'
-                                                    % read_types[read]):
-                        # Get adapter sequence
-                        adapter = self.get_option(
-                            'adapter-%s' % read_types[read])
-
-                        # add index to adapter sequence if necessary
-                        if '((INDEX))' in adapter:
-                            index = self.find_upstream_info_for_input_paths(
-                                input_paths,
-                                'index-%s' % read_types[read])
-                            adapter = adapter.replace('((INDEX))', index)
-
-                        # create reverse complement if necessary
-                        if self.get_option('use_reverse_complement'):
-                            complements = adapter.maketrans('acgtACGT',
-                                                            'tgcaTGCA')
-                            adapter = adapter.translate(complements)[::-1]
-
-                        # make sure the adapter is looking good
-                        if re.search(r'^[ACGT]+$', adapter) is None:
-                            raise StepError(self, "Unable to come up with a "
-                                            "legit-looking adapter: %s"
-                                            % adapter)
-                    # Or do we have a adapter sequence fasta file?
-                    elif self.is_option_set_in_config('adapter-file'):
-                        adapter_file = os.path.abspath(self.get_option('adapter-file'))
-                        adapter = "file:" + adapter_file
-                        if not os.path.exists(adapter_file):
-                            raise StepError(
-                                self, "File %s containing adapter sequences "
-                                "does not exist." %
-                                self.get_option('adapter-file'))
+                    adapter = adapters[read]
+                    if adapter is None:
+                        # add index to adapter sequence
+                        index = self.find_upstream_info_for_input_paths(
+                            input_paths, 'index-%s' % read_types[read])
+                        adapter = finish_adapter(self.get_option(
+                            'adapter-%s' % read_types[read]).replace(
+                                '((INDEX))', index))
 
                     # 3.3 command: Clip adapters
-                    cutadapt = [self.get_tool('cutadapt'),
+                    cutadapt = [cutadapt_tool,
                                 self.get_option('adapter-type'),
                                 adapter, '-']
                     cutadapt.extend(option_list)
@@ -487,24 +487,19 @@ class Cutadapt(AbstractStep):
                         input_paths)
 
                     # 3.4 command: Compress output
-                    pigz = [self.get_tool('pigz'),
+                    pigz = [pigz_tool,
                             '--processes', str(self.get_cores()),
                             '--blocksize', self.get_option('pigz-blocksize'),
                             '--stdout']
-                    # 3.5 command: Write to output file in 4MB chunks
+                    if self.is_option_set_in_config('pigz-level'):
+                        pigz.append('-%d' % self.get_option('pigz-level'))
                     clipped_fastq_file = run.add_output_file(
                         "%s" % read,
                         "%s_%s.fastq.gz" %
                         (run_id, read_types[read]),
                         input_paths)
 
-                    dd = [
-                        self.get_tool('dd'),
-                        'obs=%s' % self.get_option('dd-blocksize'),
-                        'of=%s' % clipped_fastq_file
-                    ]
-
                     cutadapt_pipe.add_command(cutadapt,
                                               stderr_path=cutadapt_log_file)
-                    cutadapt_pipe.add_command(pigz)
-                    cutadapt_pipe.add_command(dd)
+                    cutadapt_pipe.add_command(pigz,
+                                              stdout_path=clipped_fastq_file)
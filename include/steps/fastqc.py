@@ -159,11 +159,10 @@ class Fastqc(AbstractStep):
                 option_list.append('--%s' % option)
                 option_list.append(str(self.get_option(option)))
 
-        if 'threads' not in set_options:
-            option_list.append('--threads')
-            option_list.append(str(self.get_cores()))
-        else:
+        if self.is_option_set_in_config('threads'):
             self.set_cores(self.get_option('threads'))
+        option_list.append('--threads')
+        option_list.append(str(self.get_cores()))
 
         read_types = {'first_read': '_R1', 'second_read': '_R2'}
         for run_id in run_ids_connections_files.keys():
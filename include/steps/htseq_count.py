@@ -6,6 +6,27 @@ from abstract_step import AbstractStep
 
 logger = getLogger('uap_logger')
 
+# (suffix, is_gzipped, is_bam) of the supported alignment files
+_ALIGNMENT_SUFFIXES = (
+    ('.bam', False, True),
+    ('.sam', False, False),
+    ('.bam.gz', True, True),
+    ('.sam.gz', True, False),
+    ('.bam.gzip', True, True),
+    ('.sam.gzip', True, False),
+)
+
+
+def _contig_read_filters(contigs):
+    '''
+    Returns the samtools filter expressions that select the reads counted
+    per contig and the remaining reads. Pairs with mates on different
+    contigs are left to the remaining reads so htseq-count sees both mates.
+    '''
+    same_contig = '(!flag.paired || mrname == rname)'
+    listed = ' || '.join('rname == "%s"' % contig for contig in contigs)
+    return same_contig, '!((%s) && %s)' % (listed, same_contig)
+
 
 class HtSeqCount(AbstractStep):
     '''
@@ -33,7 +54,6 @@ class HtSeqCount(AbstractStep):
         # the counts per alignment
         self.add_connection('out/counts')
 
-        self.require_tool('dd')
         self.require_tool('pigz')
         self.require_tool('htseq-count')
         self.require_tool('samtools')
@@ -54,29 +74,67 @@ class HtSeqCount(AbstractStep):
                         default='union', optional=True)
 
         # [Options for 'dd':]
-        self.add_option('dd-blocksize', str, optional=True, default="2M")
+        self.add_option('dd-blocksize', str, optional=True, default="2M",
+                        description="Deprecated and ignored, the first "
+                        "command reads the alignment file directly.")
         self.add_option('pigz-blocksize', str, optional=True, default="2048")
-        self.add_option('threads', int, default=2, optional=True,
-                        description="start <n> threads (default:2)")
+        self.add_option('bam-native', bool, optional=True, default=None,
+                        description="Pass BAM alignments to htseq-count "
+                        "with --format=bam instead of converting them to "
+                        "SAM with samtools first. By default only "
+                        "uncompressed BAM files are passed directly.")
+        self.add_option('contigs', list, optional=True,
+                        description="Count the reads of each of these "
+                        "reference sequences with its own htseq-count "
+                        "process. A further process counts the remaining "
+                        "reads, i.e. unmapped reads, reads on other "
+                        "reference sequences and pairs with mates on "
+                        "different reference sequences, against the whole "
+                        "annotation. The summed counts equal those of a "
+                        "single htseq-count process. Requires 'order: pos', "
+                        "uncompressed, coordinate sorted and indexed BAM "
+                        "files and samtools 1.12 or later. The step uses "
+                        "one core per counting process unless 'threads' is "
+                        "set.")
+        self.add_option('decompressor', str, optional=True, default='pigz',
+                        choices=['pigz', 'igzip', 'libdeflate', 'rapidgzip'],
+                        description="Tool to uncompress gzipped alignments. "
+                        "igzip and libdeflate-gunzip are faster than pigz on "
+                        "a single core, rapidgzip uncompresses with all "
+                        "cores of the step.")
+        self.add_option('threads', int, default=None, optional=True,
+                        description="Number of cores of the step. Defaults "
+                        "to 2, or to one per counting process if 'contigs' "
+                        "is set.")
+
+    def set_options(self, options):
+        super(HtSeqCount, self).set_options(options)
+        decompressor = self.get_option('decompressor')
+        if decompressor == 'igzip':
+            self.require_tool('igzip')
+        elif decompressor == 'libdeflate':
+            self.require_tool('libdeflate-gunzip')
+        elif decompressor == 'rapidgzip':
+            self.require_tool('rapidgzip')
+        contigs = self.get_option('contigs')
+        if self.is_option_set_in_config('threads'):
+            self.set_cores(self.get_option('threads'))
+        elif contigs:
+            # one process per contig and one for the remaining reads
+            self.set_cores(len(contigs) + 1)
+        if self.is_option_set_in_config('contigs'):
+            self.require_tool('split_gtf_by_contig')
+            self.require_tool('sum_htseq_counts')
 
     def runs(self, cc):
         # Compile the list of options
         options = ['order', 'stranded', 'a', 'type', 'idattr', 'mode']
 
-        set_options = [option for option in options if
-                       self.is_option_set_in_config(option)]
+        option_list = self.get_option_arguments(options, separator='=')
 
-        option_list = list()
-        for option in set_options:
-            if isinstance(self.get_option(option), bool):
-                if self.get_option(option):
-                    option_list.append('--%s' % option)
-            else:
-                option_list.append(
-                    '--%s=%s' % (option, str(self.get_option(option))))
-
-        if 'threads' in set_options:
-            self.set_cores(self.get_option('threads'))
+        contigs = self.get_option('contigs')
+        if contigs and self.get_option('order') != 'pos':
+            raise StepError(self, "Option 'contigs' requires 'order: pos'.")
 
         # look for reference assembly in in-connections
         option_ref_assembly = self.get_option('feature-file')
@@ -91,66 +149,78 @@ class HtSeqCount(AbstractStep):
         allignment_runs = cc.get_runs_with_connections('in/alignments')
         for run_id in allignment_runs:
 
-            input_paths = cc[run_id]['in/alignments']
+            alignments = cc[run_id]['in/alignments']
             if ref_per_run:
                 # all runs come with their own reference assembly
-                ref_assembly = cc['in/features'][0]
-            if option_ref_assembly is None:
-                # include the file in the dependencies
-                input_paths.append(ref_assembly)
-
-            # Is the alignment gzipped?
-            root, ext = os.path.splitext(input_paths[0])
-            is_gzipped = True if ext in ['.gz', '.gzip'] else False
-            # Is the alignment in SAM or BAM format?
-            if is_gzipped:
-                root, ext = os.path.splitext(root)
-
-            is_bam = False
-            is_sam = False
-            if ext in ['.bam']:
-                is_bam = True
-            elif ext in ['.sam']:
-                is_sam = True
+                ref_assembly = cc[run_id]['in/features'][0]
+            # include a connected reference in the dependencies
+            input_paths = alignments + [ref_assembly] \
+                if option_ref_assembly is None else list(alignments)
+
+            # Is the alignment gzipped and in SAM or BAM format?
+            for suffix, is_gzipped, is_bam in _ALIGNMENT_SUFFIXES:
+                if alignments[0].endswith(suffix):
+                    break
             else:
                 raise StepError(
                     self, "Input file not in [SB]am format: %s" %
-                    input_paths[0])
-
-            if not (bool(is_bam) ^ bool(is_sam)):
-                raise StepError(
-                    self,
-                    "Alignment file '%s' is neither SAM nor BAM "
-                    "format" %
-                    input_paths[0])
+                    alignments[0])
 
             alignments_path = input_paths[0]
+            if contigs and (is_gzipped or not is_bam):
+                raise StepError(
+                    self, "Option 'contigs' requires uncompressed BAM "
+                    "files but got %s." % alignments_path)
 
             with self.declare_run(run_id) as run:
+                if contigs:
+                    self._add_contig_counting(
+                        run, run_id, contigs, alignments_path, input_paths,
+                        ref_assembly, option_list)
+                    continue
                 with run.new_exec_group() as exec_group:
                     with exec_group.add_pipeline() as pipe:
-                        # 1. Read alignment file in 4MB chunks
-                        dd_in = [self.get_tool('dd'),
-                                 'ibs=%s' % self.get_option('dd-blocksize'),
-                                 'if=%s' % input_paths[0]]
-                        pipe.add_command(dd_in)
-
+                        # 1. The first command reads the alignment file
+                        #    itself, later ones read from STDIN
+                        source = alignments_path
+                        decompressor = self.get_option('decompressor')
                         if is_gzipped:
                             # 2. Uncompress file to STDOUT
-                            pigz = [self.get_tool('pigz'),
-                                    '--decompress',
-                                    '--blocksize',
-                                    self.get_option('pigz-blocksize'),
-                                    '--processes',
-                                    str(self.get_cores()),
-                                    '--stdout']
-                            pipe.add_command(pigz)
+                            if decompressor == 'rapidgzip':
+                                # rapidgzip needs the seekable file to
+                                # uncompress in parallel
+                                gunzip = [self.get_tool('rapidgzip'),
+                                          '--decompress',
+                                          '-P', str(self.get_cores()),
+                                          '--stdout']
+                            elif decompressor == 'igzip':
+                                gunzip = [self.get_tool('igzip'), '-d', '-c']
+                            elif decompressor == 'libdeflate':
+                                gunzip = [self.get_tool('libdeflate-gunzip'),
+                                          '-c']
+                            else:
+                                gunzip = [self.get_tool('pigz'),
+                                          '--decompress',
+                                          '--blocksize',
+                                          self.get_option('pigz-blocksize'),
+                                          '--processes',
+                                          str(self.get_cores()),
+                                          '--stdout']
+                            gunzip.append(source)
+                            pipe.add_command(gunzip)
+                            source = '-'
 
                         # 3. Use samtools to generate SAM output
-                        if is_bam:
+                        bam_native = self.get_option('bam-native')
+                        if bam_native is None:
+                            # htseq-count reads plain BAM files itself
+                            bam_native = not is_gzipped
+                        bam_native = is_bam and bam_native
+                        if is_bam and not bam_native:
                             samtools = [self.get_tool('samtools'), 'view',
-                                        '-']
+                                        source]
                             pipe.add_command(samtools)
+                            source = '-'
 
                         # 4. Count reads with htseq-count
                         htseq_count = [
@@ -158,9 +228,10 @@ class HtSeqCount(AbstractStep):
                         ]
                         htseq_count.extend(option_list)
 
-                        htseq_count.extend(['--format=sam'])
+                        htseq_count.append(
+                            '--format=bam' if bam_native else '--format=sam')
 
-                        htseq_count.extend(['-', ref_assembly])
+                        htseq_count.extend([source, ref_assembly])
                         # sys.stderr.write("hts-cmd: %s\n" % htseq_count)
 
                         pipe.add_command(
@@ -171,3 +242,57 @@ class HtSeqCount(AbstractStep):
                                 input_paths
                             )
                         )
+
+    def _add_contig_counting(self, run, run_id, contigs, alignments_path,
+                             input_paths, ref_assembly, option_list):
+        '''
+        Counts the reads of every contig in a parallel htseq-count process,
+        the remaining reads in one more process, and sums their counts into
+        the output file of the run.
+        '''
+        # 1. Split the features by contig in a single pass
+        features = dict()
+        with run.new_exec_group() as split_group:
+            split_gtf = [self.get_tool('split_gtf_by_contig'), ref_assembly]
+            for contig in contigs:
+                features[contig] = run.add_temporary_file(
+                    'features-%s' % contig, suffix='.gtf')
+                split_gtf.extend([contig, features[contig]])
+            split_group.add_command(split_gtf)
+
+        # 2. Count the reads of each contig and the remaining reads in
+        #    parallel, every read and its mate end up in exactly one process
+        contig_filter, rest_filter = _contig_read_filters(contigs)
+        shards = [([alignments_path, contig], contig_filter,
+                   features[contig], contig) for contig in contigs]
+        shards.append(([alignments_path], rest_filter, ref_assembly,
+                       'remaining'))
+        contig_counts = list()
+        with run.new_exec_group() as count_group:
+            for region, read_filter, shard_features, name in shards:
+                with count_group.add_pipeline() as pipe:
+                    samtools = [self.get_tool('samtools'), 'view', '-u',
+                                '-e', read_filter]
+                    samtools.extend(region)
+                    pipe.add_command(samtools)
+
+                    htseq_count = [self.get_tool('htseq-count')]
+                    htseq_count.extend(option_list)
+                    htseq_count.extend(['--format=bam', '-',
+                                        shard_features])
+                    counts = run.add_temporary_file('counts-%s' % name)
+                    contig_counts.append(counts)
+                    pipe.add_command(htseq_count, stdout_path=counts)
+
+        # 3. Sum the counts of all processes
+        with run.new_exec_group() as sum_group:
+            sum_counts = [self.get_tool('sum_htseq_counts')]
+            sum_counts.extend(contig_counts)
+            sum_group.add_command(
+                sum_counts,
+                stdout_path=run.add_output_file(
+                    'counts',
+                    '%s-htseq_counts.txt' % run_id,
+                    input_paths
+                )
+            )
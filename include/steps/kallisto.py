@@ -83,8 +83,28 @@ class Kallisto(AbstractStep):
             description="Estimated standard deviation of fragment length")
         # skipping gtf, pseudobam, genomebam, chromosomes
 
+        self.add_option('compress-outputs', bool, optional=True,
+                        default=False,
+                        description="Compress the logs and abundance.tsv "
+                        "with pigz after the quantification.")
+        self.add_option('compression-threads', int, optional=True,
+                        default=1,
+                        description="Number of threads pigz uses to "
+                        "compress the outputs.")
+
+    def set_options(self, options):
+        super(Kallisto, self).set_options(options)
+        if self.get_option('compress-outputs'):
+            self.require_tool('pigz')
+
     def runs(self, cc):
-        self.set_cores(self.get_option('cores'))
+        compress = self.get_option('compress-outputs')
+        # pigz only starts after kallisto is done
+        if compress:
+            self.set_cores(max(self.get_option('cores'),
+                               self.get_option('compression-threads')))
+        else:
+            self.set_cores(self.get_option('cores'))
 
         if self.is_option_set_in_config('index'):
             option_index_path = os.path.abspath(self.get_option('index'))
@@ -100,6 +120,19 @@ class Kallisto(AbstractStep):
             raise StepError(
                 self, "No kallisto index give via config or connection.")
 
+        # flags first, then the options with values
+        option_list = self.get_option_arguments(
+            ['fr-stranded', 'rf-stranded', 'bias', 'single-overhang',
+             'single', 'bootstrap-samples', 'seed', 'fragment-length', 'sd'])
+        option_list.extend(['-o', '.'])
+        # the same for all runs, only index and reads differ
+        kallisto_base = [self.get_tool('kallisto'), 'quant',
+                         '-t', str(self.get_option('cores'))]
+
+        if compress:
+            pigz_base = [self.get_tool('pigz'), '--processes',
+                         str(self.get_option('compression-threads'))]
+
         read_runs = cc.get_runs_with_connections(
             ['in/first_read', 'in/second_read'])
         for run_id in read_runs:
@@ -116,49 +149,40 @@ class Kallisto(AbstractStep):
 
                 kallisto_eg = run.new_exec_group()
 
-                kallisto = [self.get_tool('kallisto'), 'quant']
-                kallisto.extend(['-t', str(self.get_option('cores'))])
-
                 d_files = input_fileset[:]
                 if index_per_run is True:
                     index_path = cc[run_id]['in/kallisto-index'][0]
-                kallisto.extend(['--index', index_path])
                 if option_index_path is None:
                     d_files.append(index_path)
 
-                flags = ['fr-stranded', 'rf-stranded',
-                         'bias', 'single-overhang', 'single']
-
-                for flag in flags:
-                    if self.is_option_set_in_config(
-                            flag) and self.get_option(flag):
-                        kallisto.append('--' + flag)
-
-                param_flags = ['bootstrap-samples', 'seed',
-                               'fragment-length', 'sd']
-
-                for param_flag in param_flags:
-                    if self.is_option_set_in_config(param_flag):
-                        kallisto.extend(['--' + param_flag,
-                                         str(self.get_option(param_flag))])
-
-                kallisto.extend(['-o', '.'])
-
+                kallisto = kallisto_base + ['--index', index_path]
+                kallisto.extend(option_list)
                 kallisto.extend(input_fileset)
 
+                # pigz replaces each file by its .gz version
+                gz = '.gz' if compress else ''
                 stderr_file = "%s-kallisto-log_stderr.txt" % (run_id)
                 log_stderr = run.add_output_file("log_stderr",
-                                                 stderr_file, d_files)
+                                                 stderr_file + gz, d_files)
                 stdout_file = "%s-kallisto-log_stdout.txt" % (run_id)
                 log_stdout = run.add_output_file("log_stdout",
-                                                 stdout_file, d_files)
+                                                 stdout_file + gz, d_files)
 
                 h5_file = "abundance.h5"
                 run.add_output_file("abundance.h5", h5_file, d_files)
                 tsv_file = "abundance.tsv"
-                run.add_output_file("abundance.tsv", tsv_file, d_files)
+                run.add_output_file("abundance.tsv", tsv_file + gz, d_files)
                 run_info = "run_info.json"
                 run.add_output_file("run_info.json", run_info, d_files)
 
-                kallisto_eg.add_command(kallisto, stdout_path=log_stdout,
-                                        stderr_path=log_stderr)
+                if compress:
+                    kallisto_eg.add_command(kallisto,
+                                            stdout_path=stdout_file,
+                                            stderr_path=stderr_file)
+                    with run.new_exec_group() as pigz_eg:
+                        pigz = pigz_base + [stderr_file, stdout_file,
+                                            tsv_file]
+                        pigz_eg.add_command(pigz)
+                else:
+                    kallisto_eg.add_command(kallisto, stdout_path=log_stdout,
+                                            stderr_path=log_stderr)
@@ -76,6 +76,43 @@ class Post_CufflinksSuite(AbstractStep):
             bool,
             description='Combines remove-by-class and remove-by-gene-name',
             default=False)
+        self.add_option(
+            'awk-prefilter',
+            bool,
+            optional=True,
+            description='Drop the lines of remove-gencode, remove-unstranded '
+            'and filter-by-class with awk before post_cufflinks_merge '
+            'parses them. Requires the tool awk.',
+            default=False)
+
+    def set_options(self, options):
+        super(Post_CufflinksSuite, self).set_options(options)
+        if self._awk_prefilter():
+            self.require_tool('awk')
+
+    def _awk_prefilter(self):
+        '''
+        Returns the awk conditions a GTF line has to meet to survive the
+        plain filters of post_cufflinks_merge. Dropping these lines with
+        awk first spares the tool from parsing them. Filters with
+        regular expressions stay in post_cufflinks_merge.
+        '''
+        conditions = list()
+        if not self.get_option('awk-prefilter'):
+            return conditions
+        if self.get_option('remove-unstranded'):
+            conditions.append('$7 != "."')
+        if self.get_option('remove-gencode'):
+            conditions.append('$9 !~ /(^|; *)gene_name "[^"]*ENS/')
+        class_list = self.get_option('class-list')
+        if self.get_option('filter-by-class') and class_list:
+            codes = class_list.replace("'", '').split(',')
+            # single character codes fit into a bracket expression
+            if all(len(code) == 1 and code not in '^-]\\'
+                   for code in codes):
+                conditions.append('$9 !~ /(^|; *)class_code "[%s]"/'
+                                  % ''.join(codes))
+        return conditions
 
     def runs(self, run_ids_connections_files):
 
@@ -88,17 +125,7 @@ class Post_CufflinksSuite(AbstractStep):
             'filter-by-class',
             'filter-by-class-and-gene-name']
 
-        set_options = [option for option in options if
-                       self.is_option_set_in_config(option)]
-
-        option_list = list()
-        for option in set_options:
-            if isinstance(self.get_option(option), bool):
-                if self.get_option(option):
-                    option_list.append('--%s' % option)
-            else:
-                option_list.append('--%s' % option)
-                option_list.append(str(self.get_option(option)))
+        option_list = self.get_option_arguments(options)
 
         run_id = self.get_option('run_id')
 
@@ -118,8 +145,21 @@ class Post_CufflinksSuite(AbstractStep):
 
                 post_cufflinks_merge = [self.get_tool('post_cufflinks_merge')]
                 post_cufflinks_merge.extend(option_list)
-                post_cufflinks_merge.extend([input_paths[0]])
 
-                pc_exec_group.add_command(post_cufflinks_merge,
-                                          stdout_path=outfile,
-                                          stderr_path=logfile)
+                conditions = self._awk_prefilter()
+                if conditions:
+                    with pc_exec_group.add_pipeline() as pipe:
+                        # drop lines of plain filters in a single pass
+                        awk = [self.get_tool('awk'),
+                               'BEGIN { FS = "\\t" } ' +
+                               ' && '.join(conditions), input_paths[0]]
+                        pipe.add_command(awk)
+                        # post_cufflinks_merge reads STDIN
+                        pipe.add_command(post_cufflinks_merge,
+                                         stdout_path=outfile,
+                                         stderr_path=logfile)
+                else:
+                    post_cufflinks_merge.extend([input_paths[0]])
+                    pc_exec_group.add_command(post_cufflinks_merge,
+                                              stdout_path=outfile,
+                                              stderr_path=logfile)
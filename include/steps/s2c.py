@@ -33,7 +33,6 @@ class S2C(AbstractStep):
         self.require_tool('fix_s2c')
         self.require_tool('samtools')
         self.require_tool('pigz')
-        self.require_tool('cat')
         self.require_tool('dd')
 
         self.add_option('tmp_dir', str, optional=False,
@@ -47,8 +46,27 @@ class S2C(AbstractStep):
             description="specifies the maximal distance of a splice junction. "
             "junctions with disctance higher than this value are classified as "
             "fusions (default is 200.000nt)")
+        self.add_option('decompressor', str, optional=True,
+                        default='pigz', choices=['pigz', 'igzip'],
+                        description="Tool used to uncompress the alignments. "
+                        "igzip (ISA-L) decodes faster on a single thread but "
+                        "has to be configured as a tool.")
+
+    def set_options(self, options):
+        super(S2C, self).set_options(options)
+        if self.get_option('decompressor') == 'igzip':
+            self.require_tool('igzip')
 
     def runs(self, run_ids_connections_files):
+        # look up the tools once for all runs
+        if self.get_option('decompressor') == 'igzip':
+            decompress = [self.get_tool('igzip'), '-d', '-c']
+        else:
+            decompress = [self.get_tool('pigz'), '--decompress',
+                          '--processes', str(self.get_cores()), '--stdout']
+        s2c_tool = self.get_tool('s2c')
+        fix_s2c_tool = self.get_tool('fix_s2c')
+        pigz_tool = self.get_tool('pigz')
 
         for run_id in run_ids_connections_files.keys():
 
@@ -73,15 +91,10 @@ class S2C(AbstractStep):
                             self.get_option('tmp_dir'))
 
                 alignments_path = input_paths[0]
-                cat = [self.get_tool('cat'), alignments_path]
 #                pigz = [self.get_tool('pigz'), '--decompress', '--processes', '1', '--stdout']
-                pigz = [self.get_tool('pigz'),
-                        '--decompress',
-                        '--processes',
-                        str(self.get_cores()),
-                        '--stdout']
+                pigz = decompress + [alignments_path]
                 s2c = [
-                    self.get_tool('s2c'),
+                    s2c_tool,
                     '-s',
                     '/dev/stdin',
                     '-o',
@@ -90,16 +103,15 @@ class S2C(AbstractStep):
                     s2c.extend(['-d', str(self.get_option('maxDist'))])
 
                 # schreibt .sam nach stdout
-                fix_s2c = [self.get_tool('fix_s2c')]
-#                pigz2 = [self.get_tool('pigz'), '--processes', '2', '--stdout']
-                pigz2 = [self.get_tool('pigz'),
+                fix_s2c = [fix_s2c_tool]
+#                pigz2 = [pigz_tool, '--processes', '2', '--stdout']
+                pigz2 = [pigz_tool,
                          '--processes',
                          str(self.get_cores()),
                          '--stdout']
 
                 with run.new_exec_group() as exec_group:
                     with exec_group.add_pipeline() as s2c_pipe:
-                        s2c_pipe.add_command(cat)
                         s2c_pipe.add_command(pigz)
                         s2c_pipe.add_command(s2c)
                         s2c_pipe.add_command(fix_s2c)
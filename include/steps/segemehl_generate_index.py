@@ -26,7 +26,6 @@ class SegemehlGenerateIndex(AbstractStep):
         self.add_connection('out/segemehl_index')
         self.add_connection('out/log')
 
-        self.require_tool('dd')
         self.require_tool('mkfifo')
         self.require_tool('pigz')
         self.require_tool('segemehl')
@@ -39,32 +38,41 @@ class SegemehlGenerateIndex(AbstractStep):
                         description="start <n> threads (default:4)")
 
         # Options for dd
-        self.add_option('dd-blocksize', str, optional=True, default="2M")
+        self.add_option('dd-blocksize', str, optional=True, default="2M",
+                        description="Deprecated and ignored, the reference "
+                        "sequences are read directly.")
         # Options for pigz
         self.add_option('pigz-blocksize', str, optional=True, default="2048")
+        self.add_option('decompressor', str, optional=True, default='pigz',
+                        choices=['pigz', 'rapidgzip'],
+                        description="Tool to uncompress gzipped reference "
+                        "sequences. rapidgzip uncompresses with all cores "
+                        "of the step.")
 
-    def runs(self, run_ids_connections_files):
-
-        options = ['threads']
+    def set_options(self, options):
+        super(SegemehlGenerateIndex, self).set_options(options)
+        if self.get_option('decompressor') == 'rapidgzip':
+            self.require_tool('rapidgzip')
 
-        set_options = [option for option in options if
-                       self.is_option_set_in_config(option)]
+    def runs(self, run_ids_connections_files):
 
-        option_list = list()
-        for option in set_options:
-            if isinstance(self.get_option(option), bool):
-                if self.get_option(option):
-                    option_list.append('--%s' % option)
-            else:
-                option_list.append('--%s' % option)
-                option_list.append(str(self.get_option(option)))
+        option_list = self.get_option_arguments(['threads'])
 
-        if 'threads' not in set_options:
+        if not self.is_option_set_in_config('threads'):
             option_list.append('--threads')
             option_list.append(str(self.get_cores()))
         else:
             self.set_cores(self.get_option('threads'))
 
+        # look up the tools once for all runs
+        mkfifo_tool = self.get_tool('mkfifo')
+        segemehl_tool = self.get_tool('segemehl')
+        if self.get_option('decompressor') == 'rapidgzip':
+            gunzip_base = [self.get_tool('rapidgzip'), '--decompress',
+                           '-P', str(self.get_cores()), '--stdout']
+        else:
+            gunzip_base = [self.get_tool('pigz'), '--decompress', '--stdout']
+
         for run_id in run_ids_connections_files.keys():
             index_basename = "%s-%s" % (
                 self.get_option('index-basename'), run_id)
@@ -78,18 +86,20 @@ class SegemehlGenerateIndex(AbstractStep):
                                     "connection in/reference_sequence.")
                 # Get names of FIFOs
                 refseq_fifos = list()
-                index_fifo = run.add_temporary_file(
-                    'segemehl-index-fifo', designation='output')
 
                 with run.new_exec_group() as exec_group:
-                    # 1. Create FIFOs ...
-                    # 1.1 ... for the input sequence
+                    # 1. Create FIFOs for the gzipped input sequences
                     for seq_file in refseq:
                         # Is the reference gzipped?
                         root, ext = os.path.splitext(
                             os.path.basename(seq_file))
                         is_gzipped = True if ext in ['.gz', '.gzip'] else False
 
+                        if not is_gzipped:
+                            # segemehl reads the file itself
+                            refseq_fifos.append(seq_file)
+                            continue
+
                         # Create FIFO for input file
                         seq_fifo = run.add_temporary_file(
                             '%s-fifo' %
@@ -99,52 +109,23 @@ class SegemehlGenerateIndex(AbstractStep):
                         refseq_fifos.append(seq_fifo)
 
                         mkfifo_seq = [
-                            self.get_tool('mkfifo'),
+                            mkfifo_tool,
                             seq_fifo
                         ]
                         exec_group.add_command(mkfifo_seq)
 
-                        # Feed reference sequence to seq_fifo
-                        dd_refseq = [
-                            self.get_tool('dd'),
-                            'bs=%s' % self.get_option('dd-blocksize'),
-                            'if=%s' % seq_file
-                        ]
-
-                        if is_gzipped:
-                            with exec_group.add_pipeline() as pipe:
-
-                                pigz = [
-                                    self.get_tool('pigz'),
-                                    '--decompress',
-                                    '--stdout']
-
-                                dd_out = [
-                                    self.get_tool('dd'),
-                                    'bs=%s' %
-                                    self.get_option('dd-blocksize'),
-                                    'of=%s' %
-                                    seq_fifo]
-                                pipe.add_command(dd_refseq)
-                                pipe.add_command(pigz)
-                                pipe.add_command(dd_out)
-                        else:
-                            dd_refseq.append(
-                                'of=%s' % seq_fifo
-                            )
-                            exec_group.add_command(dd_refseq)
-
-                    # 1.2 ... for the index to be generated
-                    mkfifo_index = [
-                        self.get_tool('mkfifo'),
-                        index_fifo
-                    ]
-                    exec_group.add_command(mkfifo_index)
+                        # Uncompress reference sequence into seq_fifo
+                        gunzip = gunzip_base + [seq_file]
+                        exec_group.add_command(gunzip, stdout_path=seq_fifo)
 
-                    # 1. Start segemehl
+                    # 2. Start segemehl, it writes the index directly
+                    index_file = run.add_output_file(
+                        'segemehl_index',
+                        '%s.idx' % index_basename,
+                        refseq)
                     segemehl = [
-                        self.get_tool('segemehl'),
-                        '--generate', index_fifo,
+                        segemehl_tool,
+                        '--generate', index_file,
                         '--database', " ".join(refseq_fifos)
                     ]
                     segemehl.extend(option_list)
@@ -158,14 +139,3 @@ class SegemehlGenerateIndex(AbstractStep):
                         )
                     )
 
-                    # Read index from index_fifo
-                    dd_index = [self.get_tool('dd'),
-                                'bs=%s' % self.get_option('dd-blocksize'),
-                                'if=%s' % index_fifo]
-                    exec_group.add_command(
-                        dd_index,
-                        stdout_path=run.add_output_file(
-                            'segemehl_index',
-                            '%s.idx' % index_basename,
-                            refseq)
-                    )
@@ -0,0 +1,142 @@
+'''
+Tests of the htseq_count step, in particular of its 'contigs' option.
+
+Run them from the repository root with::
+
+    python -m unittest discover -s test
+'''
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+repo = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, os.path.join(repo, 'include'))
+
+import abstract_step  # noqa: E402 (adds the step directories to sys.path)
+from htseq_count import HtSeqCount, _contig_read_filters  # noqa: E402
+
+TOOLS = os.path.join(repo, 'tools')
+
+SAM = '''@HD\tVN:1.6\tSO:unsorted
+@SQ\tSN:chr1\tLN:1000
+@SQ\tSN:chr2\tLN:1000
+@SQ\tSN:chr3\tLN:1000
+p1\t99\tchr1\t120\t60\t10M\t=\t150\t40\tAAAAAAAAAA\tIIIIIIIIII\tNH:i:1
+p1\t147\tchr1\t150\t60\t10M\t=\t120\t-40\tAAAAAAAAAA\tIIIIIIIIII\tNH:i:1
+p2\t97\tchr1\t130\t60\t10M\tchr2\t120\t0\tAAAAAAAAAA\tIIIIIIIIII\tNH:i:1
+p2\t145\tchr2\t120\t60\t10M\tchr1\t130\t0\tAAAAAAAAAA\tIIIIIIIIII\tNH:i:1
+p3\t99\tchr3\t120\t60\t10M\t=\t150\t40\tAAAAAAAAAA\tIIIIIIIIII\tNH:i:1
+p3\t147\tchr3\t150\t60\t10M\t=\t120\t-40\tAAAAAAAAAA\tIIIIIIIIII\tNH:i:1
+p4\t77\t*\t0\t0\t*\t*\t0\t0\tAAAAAAAAAA\tIIIIIIIIII
+p4\t141\t*\t0\t0\t*\t*\t0\t0\tAAAAAAAAAA\tIIIIIIIIII
+p5\t99\tchr2\t500\t60\t10M\t=\t530\t40\tAAAAAAAAAA\tIIIIIIIIII\tNH:i:1
+p5\t147\tchr2\t530\t60\t10M\t=\t500\t-40\tAAAAAAAAAA\tIIIIIIIIII\tNH:i:1
+'''
+
+GTF = ''.join(
+    '%s\ttest\texon\t100\t200\t.\t+\t.\tgene_id "%s";\n' % (contig, gene)
+    for contig, gene in [('chr2', 'g2'), ('chr1', 'g1'), ('chr3', 'g3')])
+
+
+def step(**options):
+    htseq_count = HtSeqCount(None)
+    config = {'order': 'pos', 'stranded': 'no'}
+    config.update(options)
+    htseq_count.set_options(config)
+    return htseq_count
+
+
+class TestCores(unittest.TestCase):
+
+    def test_default(self):
+        self.assertEqual(step().get_cores(), 2)
+
+    def test_contigs(self):
+        # one process per contig and one for the remaining reads
+        self.assertEqual(step(contigs=['chr1', 'chr2']).get_cores(), 3)
+
+    def test_threads(self):
+        cores = step(contigs=['chr1', 'chr2'], threads=5).get_cores()
+        self.assertEqual(cores, 5)
+
+
+class TestSumCounts(unittest.TestCase):
+
+    def test_order(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        shards = [('b\t1\na\t2\n__no_feature\t3\n__ambiguous\t0\n'),
+                  ('c\t4\na\t1\n__no_feature\t1\n__ambiguous\t2\n')]
+        paths = list()
+        for index, content in enumerate(shards):
+            paths.append(os.path.join(tmp, 'counts-%d' % index))
+            with open(paths[-1], 'w') as counts:
+                counts.write(content)
+        summed = subprocess.check_output(
+            [sys.executable, os.path.join(TOOLS, 'sum_htseq_counts.py')] +
+            paths, universal_newlines=True)
+        self.assertEqual(
+            summed, 'a\t3\nb\t1\nc\t4\n__no_feature\t4\n__ambiguous\t2\n')
+
+
+@unittest.skipUnless(shutil.which('samtools') and shutil.which('htseq-count'),
+                     'samtools and htseq-count are required')
+class TestContigCounting(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        sam = self.path('reads.sam')
+        with open(sam, 'w') as f:
+            f.write(SAM)
+        self.bam = self.path('reads.bam')
+        subprocess.check_call(['samtools', 'sort', '-o', self.bam, sam])
+        subprocess.check_call(['samtools', 'index', self.bam])
+        self.gtf = self.path('features.gtf')
+        with open(self.gtf, 'w') as f:
+            f.write(GTF)
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def htseq_count(self, source, gtf, stdin=None):
+        return subprocess.check_output(
+            ['htseq-count', '--order=pos', '--stranded=no', '--format=bam',
+             source, gtf], stdin=stdin, universal_newlines=True,
+            stderr=subprocess.DEVNULL)
+
+    def test_same_counts_as_unsharded(self):
+        # chr3 carries a gene but is left to the remaining reads
+        contigs = ['chr1', 'chr2']
+        split_gtf = [sys.executable,
+                     os.path.join(TOOLS, 'split_gtf_by_contig.py'), self.gtf]
+        for contig in contigs:
+            split_gtf.extend([contig, self.path('%s.gtf' % contig)])
+        subprocess.check_call(split_gtf)
+
+        contig_filter, rest_filter = _contig_read_filters(contigs)
+        shards = [([self.bam, contig], contig_filter,
+                   self.path('%s.gtf' % contig)) for contig in contigs]
+        shards.append(([self.bam], rest_filter, self.gtf))
+        counts = list()
+        for region, read_filter, features in shards:
+            reads = subprocess.Popen(
+                ['samtools', 'view', '-u', '-e', read_filter] + region,
+                stdout=subprocess.PIPE)
+            counts.append(self.path('counts-%d' % len(counts)))
+            with open(counts[-1], 'w') as f:
+                f.write(self.htseq_count('-', features, stdin=reads.stdout))
+            reads.stdout.close()
+            self.assertEqual(reads.wait(), 0)
+
+        summed = subprocess.check_output(
+            [sys.executable, os.path.join(TOOLS, 'sum_htseq_counts.py')] +
+            counts, universal_newlines=True)
+        self.assertEqual(summed, self.htseq_count(self.bam, self.gtf))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -39,16 +39,30 @@ def main():
                         type=str,
                         help="secure hash used for comparision")
 
+    parser.add_argument("--write-to",
+                        dest="write_to",
+                        default=None,
+                        type=str,
+                        help="write the hashed input to this file, e.g. to "
+                        "hash a download while it is\nread from stdin (-)")
+
     # get arguments and call the appropriate function
     args = parser.parse_args()
 
-    computed_hash_value = hashfile(args.file_to_hash,
-                                   getattr(hashlib, args.hash_alg)()
-                                   )
+    if args.write_to:
+        with open(args.write_to, 'wb') as out_handle:
+            computed_hash_value = hashfile(args.file_to_hash,
+                                           getattr(hashlib, args.hash_alg)(),
+                                           out_handle=out_handle)
+        file_to_hash_abspath = os.path.abspath(args.write_to)
+    else:
+        computed_hash_value = hashfile(args.file_to_hash,
+                                       getattr(hashlib, args.hash_alg)()
+                                       )
+        file_to_hash_abspath = os.path.abspath(args.file_to_hash.name)
     print("Provided hash value: %s" % args.provided_hash_value)
     print("Computed hash value: %s" % computed_hash_value)
 
-    file_to_hash_abspath = os.path.abspath(args.file_to_hash.name)
     abspath, filename = os.path.split(file_to_hash_abspath)
     file_to_hash_new_path = os.path.join(
         abspath, "%s.mismatching.%s" % (filename, args.hash_alg))
@@ -69,10 +83,16 @@ def main():
 # http://stackoverflow.com/questions/3431825/generating-a-md5-checksum-of-a-file
 
 
-def hashfile(file_handle, hasher, blocksize=65536):
+def hashfile(file_handle, hasher, blocksize=1024 * 1024, out_handle=None):
+    if out_handle is None and hasattr(hashlib, 'file_digest'):
+        # Python >= 3.11 hashes in C without the GIL, hashlib uses the
+        # OpenSSL implementations with SHA CPU extensions where available
+        return hashlib.file_digest(file_handle, lambda: hasher).hexdigest()
     buf = file_handle.read(blocksize)
     while len(buf) > 0:
         hasher.update(buf)
+        if out_handle is not None:
+            out_handle.write(buf)
         buf = file_handle.read(blocksize)
     return hasher.hexdigest()
 
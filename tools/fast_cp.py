@@ -0,0 +1,43 @@
+#! /usr/bin/env python
+import argparse
+import os
+import shutil
+import sys
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description='This script hard links SOURCE to DEST if both are on '
+        'the same file system and copies it otherwise. The copy lets the '
+        'kernel move the data where possible.',
+        prog='fast_cp.py',
+        formatter_class=argparse.RawTextHelpFormatter)
+
+    parser.add_argument('--version',
+                        action='version',
+                        version='%(prog)s 0.01'
+                        )
+
+    parser.add_argument("source",
+                        help="file to copy"
+                        )
+
+    parser.add_argument("dest",
+                        help="name of the copy"
+                        )
+
+    args = parser.parse_args()
+
+    try:
+        os.link(args.source, args.dest)
+    except OSError:
+        try:
+            shutil.copyfile(args.source, args.dest)
+        except OSError as e:
+            sys.exit("Could not copy %s to %s: %s" %
+                     (args.source, args.dest, e))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#! /usr/bin/env python
+import argparse
+import os
+import sys
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description='This script creates a symbolic link for every pair of '
+        'arguments, so that many links need only one process.',
+        prog='ln_many.py',
+        formatter_class=argparse.RawTextHelpFormatter)
+
+    parser.add_argument('--version',
+                        action='version',
+                        version='%(prog)s 0.01'
+                        )
+
+    parser.add_argument("pairs",
+                        nargs='+',
+                        metavar='TARGET LINK_NAME',
+                        help="pairs of link targets and link names"
+                        )
+
+    args = parser.parse_args()
+
+    if len(args.pairs) % 2 != 0:
+        parser.error("Expected pairs of TARGET and LINK_NAME, got an odd "
+                     "number of arguments.")
+
+    for target, link_name in zip(args.pairs[0::2], args.pairs[1::2]):
+        try:
+            os.symlink(target, link_name)
+        except OSError as e:
+            sys.exit("Could not link %s to %s: %s" %
+                     (link_name, target, e.strerror))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#! /usr/bin/env python
+import argparse
+import sys
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description='This script writes the features of each given contig '
+        'of a GTF file into its own file in a single pass.',
+        prog='split_gtf_by_contig.py',
+        formatter_class=argparse.RawTextHelpFormatter)
+
+    parser.add_argument('--version',
+                        action='version',
+                        version='%(prog)s 0.01'
+                        )
+
+    parser.add_argument("gtf",
+                        help="GTF file to split"
+                        )
+
+    parser.add_argument("pairs",
+                        nargs='+',
+                        metavar='CONTIG OUT_FILE',
+                        help="pairs of contig names and output files"
+                        )
+
+    args = parser.parse_args()
+
+    if len(args.pairs) % 2 != 0:
+        parser.error("Expected pairs of CONTIG and OUT_FILE, got an odd "
+                     "number of arguments.")
+
+    out_files = dict()
+    try:
+        for contig, out_file in zip(args.pairs[0::2], args.pairs[1::2]):
+            out_files[contig] = open(out_file, 'w')
+        with open(args.gtf, 'r') as gtf:
+            for line in gtf:
+                if line.startswith('#'):
+                    continue
+                out = out_files.get(line.split('\t', 1)[0])
+                if out is not None:
+                    out.write(line)
+    except OSError as e:
+        sys.exit("Could not split %s: %s" % (args.gtf, e))
+    finally:
+        for out in out_files.values():
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
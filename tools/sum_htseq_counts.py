@@ -0,0 +1,45 @@
+#! /usr/bin/env python
+import argparse
+import sys
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description='This script sums the counts of htseq-count output files '
+        'of the same sample, e.g. counted per contig, and writes them to '
+        'STDOUT. Like htseq-count, the features are sorted by name and '
+        'the special counters starting with "__" follow at the end.',
+        prog='sum_htseq_counts.py',
+        formatter_class=argparse.RawTextHelpFormatter)
+
+    parser.add_argument('--version',
+                        action='version',
+                        version='%(prog)s 0.01'
+                        )
+
+    parser.add_argument("counts",
+                        nargs='+',
+                        help="htseq-count output files"
+                        )
+
+    args = parser.parse_args()
+
+    # dicts keep the insertion order
+    features = dict()
+    specials = dict()
+    for counts_file in args.counts:
+        with open(counts_file, 'r') as counts:
+            for line in counts:
+                feature, count = line.rstrip('\n').rsplit('\t', 1)
+                target = specials if feature.startswith('__') else features
+                target[feature] = target.get(feature, 0) + int(count)
+
+    for feature in sorted(features):
+        sys.stdout.write('%s\t%d\n' % (feature, features[feature]))
+    for feature, count in specials.items():
+        sys.stdout.write('%s\t%d\n' % (feature, count))
+
+
+if __name__ == '__main__':
+    main()